@@ -4,5 +4,21 @@ set -o errexit
 
 pip install -r requirements.txt
 
+# Compile, purge and minify the Tailwind CSS bundle with the standalone CLI (no Node needed).
+TAILWIND_VERSION="${TAILWIND_VERSION:-v3.4.17}"
+case "$(uname -m)" in
+    aarch64|arm64) TAILWIND_ARCH=arm64 ;;
+    *) TAILWIND_ARCH=x64 ;;
+esac
+TAILWIND_BIN=".cache/tailwindcss-${TAILWIND_VERSION}-${TAILWIND_ARCH}"
+if [ ! -x "$TAILWIND_BIN" ]; then
+    mkdir -p .cache
+    curl -sSLf -o "$TAILWIND_BIN" \
+        "https://github.com/tailwindlabs/tailwindcss/releases/download/${TAILWIND_VERSION}/tailwindcss-linux-${TAILWIND_ARCH}"
+    chmod +x "$TAILWIND_BIN"
+fi
+NODE_ENV=production "$TAILWIND_BIN" -c tailwind.config.js -i static/src/input.css -o static/css/app.css --minify
+
+# Fingerprinted, gzip and brotli compressed copies for WhiteNoise
 python manage.py collectstatic --no-input
 python manage.py migrate
@@ -12,8 +12,11 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 import os
 import dj_database_url
+from importlib.util import find_spec
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -31,6 +34,9 @@ ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "").split(" ")
 if not ALLOWED_HOSTS or ALLOWED_HOSTS == [""]:
     ALLOWED_HOSTS = ["*"]  # Default/fallback
 
+# Scheme and host used for links in emails
+SITE_URL = os.environ.get("SITE_URL", "http://127.0.0.1:8000")
+
 
 
 # Application definition
@@ -46,8 +52,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "events.middleware.ViewTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "events.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -56,6 +64,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Serve the event list, event detail and dashboard as native async views.
+# Only useful under ASGI (uvicorn); see the README.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "False").lower() == "true"
+if ASYNC_VIEWS:
+    # WhiteNoise is sync-only and would run every request through one thread;
+    # put the hashed files in STATIC_ROOT behind the proxy or CDN instead.
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -80,16 +96,176 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are kept open between requests (DB_CONN_MAX_AGE seconds, checked
+# before reuse) unless DB_POOL is set, which uses psycopg's connection pool
+# instead (needs `psycopg[pool]`). Pool sizes are per gunicorn worker process.
+# Under ASGI (ASYNC_VIEWS) connections belong to the threads that run each request's
+# queries and are never reused, so they default to closing after every request;
+# set DB_POOL to reuse them.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", "0" if ASYNC_VIEWS else "600"))
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+DB_POOL = os.environ.get("DB_POOL", "False").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "4"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
+
+# SQLite: WAL lets readers run alongside a writer, and IMMEDIATE transactions plus
+# a busy timeout make concurrent writers wait instead of failing with "database is locked".
+SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", "20"))
+SQLITE_OPTIONS = {
+    "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+    "transaction_mode": "IMMEDIATE",
+    "timeout": SQLITE_BUSY_TIMEOUT,
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "OPTIONS": SQLITE_OPTIONS,
     }
 }
 
+
+def database_from_url(url):
+    database = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    if database["ENGINE"] == "django.db.backends.sqlite3":
+        database.setdefault("OPTIONS", {}).update(SQLITE_OPTIONS)
+    elif DB_POOL:
+        if find_spec("psycopg_pool") is None:
+            raise ImproperlyConfigured("DB_POOL needs psycopg 3 with its pool: pip install 'psycopg[binary,pool]'")
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+        }
+    return database
+
+
 database_url = os.environ.get("DATABASE_URL")
 if database_url:
-    DATABASES["default"] = dj_database_url.parse(database_url)
+    DATABASES["default"] = database_from_url(database_url)
+
+# Read replicas: space-separated URLs, added as "replica_1", "replica_2", ...
+# GET requests to the event read views (events.routers.READ_VIEWS) read from them;
+# clients that just wrote are pinned to the primary for READ_YOUR_WRITES_SECONDS. To try it locally,
+# copy db.sqlite3 and point DATABASE_REPLICA_URLS at the copy (sqlite:////path/to/copy).
+DATABASE_REPLICAS = []
+for number, replica_url in enumerate(os.environ.get("DATABASE_REPLICA_URLS", "").split(), 1):
+    alias = f"replica_{number}"
+    DATABASES[alias] = database_from_url(replica_url)
+    # Tests run against the primary only.
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["events.routers.ReplicaRouter"]
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", "10"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Per-process memory by default; set REDIS_URL so every worker shares (and
+# invalidates) the same entries.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+redis_url = os.environ.get("REDIS_URL")
+if redis_url:
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": redis_url,
+    }
+
+# Rendered event list/detail pages and fragments (see events/pagecache.py).
+# PAGE_CACHE_BACKEND: "redis" (default with REDIS_URL), "file" (shared by the
+# workers of one host) or "locmem" (default otherwise, single process only).
+page_cache_backend = os.environ.get("PAGE_CACHE_BACKEND", "redis" if redis_url else "locmem")
+if page_cache_backend == "file":
+    CACHES["pages"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("PAGE_CACHE_LOCATION", BASE_DIR / ".cache" / "pages"),
+    }
+elif page_cache_backend == "redis":
+    CACHES["pages"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("PAGE_CACHE_LOCATION", redis_url),
+    }
+else:
+    CACHES["pages"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pages",
+    }
+
+EVENTS_PAGE_CACHE = "pages"
+
+# View timing histograms (see events/viewstats.py), written by every worker and
+# read by `manage.py view_stats` from its own process, so never per-process memory.
+if redis_url:
+    CACHES["viewstats"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": redis_url,
+    }
+else:
+    CACHES["viewstats"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("VIEW_STATS_LOCATION", BASE_DIR / ".cache" / "viewstats"),
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+VIEW_STATS_CACHE = "viewstats"
+# Worker processes per server (gunicorn reads the same variable). With more than
+# one, a per-process page cache is reported by `manage.py check` (events.W001).
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", "600"))
+
+# Sessions, request.user and roles are only read through the cache when it is shared
+# (REDIS_URL). With per-process LocMem a logout, password change, deactivation or
+# group change would only reach the worker that handled it, so they fall back to
+# the database.
+SHARED_CACHE = bool(redis_url)
+
+# SESSION_BACKEND: "cached_db" (default with REDIS_URL) reads through the cache and
+# writes to the database too; "cache" keeps them only in the cache; "db" always hits
+# the database and is used whenever there is no shared cache.
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cached_db") if SHARED_CACHE else "db"
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+}[SESSION_BACKEND]
+# Only write sessions that changed during the request.
+SESSION_SAVE_EVERY_REQUEST = False
+
+# With a shared cache request.user is loaded through it (see events/backends.py).
+# Sessions created with the other backend are logged out once when this changes.
+AUTHENTICATION_BACKENDS = [
+    "events.backends.CachedModelBackend" if SHARED_CACHE else "django.contrib.auth.backends.ModelBackend"
+]
+USER_CACHE_TIMEOUT = int(os.environ.get("USER_CACHE_TIMEOUT", "300"))
+
+# Seconds a user's group names stay cached with SHARED_CACHE (see events/roles.py)
+ROLE_CACHE_TIMEOUT = int(os.environ.get("ROLE_CACHE_TIMEOUT", "300"))
+
+# Seconds before cached dashboard totals are recounted; only cached with SHARED_CACHE
+# (see events/counters.py)
+COUNTER_CACHE_TIMEOUT = int(os.environ.get("COUNTER_CACHE_TIMEOUT", "3600"))
+
+
+# Per-view query count / latency instrumentation (events/middleware.py).
+# Samples feed `manage.py view_stats`; keep VIEW_TIMING_SAMPLE_RATE low in production.
+VIEW_TIMING_ENABLED = os.environ.get("VIEW_TIMING_ENABLED", "False").lower() == "true"
+VIEW_TIMING_SAMPLE_RATE = float(os.environ.get("VIEW_TIMING_SAMPLE_RATE", "0.1"))
+VIEW_TIMING_HEADER = os.environ.get("VIEW_TIMING_HEADER", str(DEBUG)).lower() == "true"
+VIEW_TIMING_RETENTION = int(os.environ.get("VIEW_TIMING_RETENTION", "86400"))
 
 
 # Password validation
@@ -127,9 +303,25 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
-if not DEBUG:
-    STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# Hashed file names, plus gzip and (with the Brotli package) brotli copies, so
+# WhiteNoise can serve them precompressed with far-future cache headers. The manifest
+# only exists after collectstatic, so it is off with DEBUG or STATIC_MANIFEST=False
+# (and in tests, see events.testing.TestRunner).
+STATIC_MANIFEST = os.environ.get("STATIC_MANIFEST", str(not DEBUG)).lower() == "true"
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "whitenoise.storage.CompressedManifestStaticFilesStorage"
+            if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
 
 STATICFILES_DIRS = [
     BASE_DIR / "static",
@@ -140,16 +332,53 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Serves static files without the collectstatic manifest
+TEST_RUNNER = "events.testing.TestRunner"
+
 # Media Files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded image processing (events/images.py), done by a `manage.py process_images --loop`
+# worker. IMAGE_PROCESSING_INLINE (on with DEBUG) processes uploads in the request
+# instead, which holds a web worker for the whole resize.
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "2048"))
+IMAGE_QUALITY = int(os.environ.get("IMAGE_QUALITY", "82"))
+IMAGE_PROCESSING_INLINE = os.environ.get("IMAGE_PROCESSING_INLINE", str(DEBUG)).lower() == "true"
+
 # Email Backend (Console for development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Outbound mail queue (see events/outbox.py and `manage.py send_queued_mail`)
+EMAIL_QUEUE_BATCH_SIZE = int(os.environ.get("EMAIL_QUEUE_BATCH_SIZE", "100"))
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.environ.get("EMAIL_QUEUE_MAX_ATTEMPTS", "5"))
+EMAIL_QUEUE_RETRY_DELAY = int(os.environ.get("EMAIL_QUEUE_RETRY_DELAY", "60"))
+# Seconds a worker has to send a claimed batch before others may pick it up again
+EMAIL_QUEUE_CLAIM_TIMEOUT = int(os.environ.get("EMAIL_QUEUE_CLAIM_TIMEOUT", "300"))
+
 # Authentication Redirects
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 LOGIN_URL = 'login'
 
 AUTH_USER_MODEL = 'events.CustomUser'
+
+# Event list pagination (keyset based, see events/pagination.py)
+EVENTS_PAGE_SIZE = int(os.environ.get("EVENTS_PAGE_SIZE", "25"))
+EVENTS_MAX_PAGE_SIZE = int(os.environ.get("EVENTS_MAX_PAGE_SIZE", "100"))
+
+# Participants shown per page on the event detail page and its participants endpoint
+PARTICIPANTS_PAGE_SIZE = int(os.environ.get("PARTICIPANTS_PAGE_SIZE", "50"))
+PARTICIPANTS_MAX_PAGE_SIZE = int(os.environ.get("PARTICIPANTS_MAX_PAGE_SIZE", "200"))
+
+# Rows fetched per database round trip by the CSV/NDJSON exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "2000"))
+
+# `manage.py archive_events` moves events older than this many days out of the Event table
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "90"))
+
+# Calendar feeds list events from this many days ago onwards
+CALENDAR_FEED_PAST_DAYS = int(os.environ.get("CALENDAR_FEED_PAST_DAYS", "30"))
+
+# Upcoming events listed on the admin/organizer dashboards
+DASHBOARD_EVENT_LIMIT = int(os.environ.get("DASHBOARD_EVENT_LIMIT", "20"))
@@ -5,4 +5,5 @@ class EventsConfig(AppConfig):
     name = 'events'
 
     def ready(self):
+        import events.checks
         import events.signals
@@ -0,0 +1,90 @@
+"""
+Archival of past events, driven by ``manage.py archive_events``.
+
+Events dated before a cutoff move, with their participant rows, from Event to
+ArchivedEvent, so the hot table and its indexes grow with upcoming events rather
+than with all history. Archived events stay readable on their detail pages.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import counters, pagecache, search
+from .models import ArchivedEvent, Event
+from .rsvp import USER_FIELD
+
+# Columns copied from Event; archived_at is set on insert.
+FIELDS = [field.attname for field in ArchivedEvent._meta.concrete_fields if field.name != 'archived_at']
+
+
+def cutoff_date(days=None):
+    """Events dated before this are archived."""
+    if days is None:
+        days = getattr(settings, 'ARCHIVE_AFTER_DAYS', 90)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def _copy_participants_sql(connection, placeholders):
+    through = Event.participants.through
+    archived_through = ArchivedEvent.participants.through
+    qn = connection.ops.quote_name
+    archived_user_field = ArchivedEvent.participants.field.m2m_reverse_field_name()
+    return (
+        f'INSERT INTO {qn(archived_through._meta.db_table)} '
+        f'({qn(archived_through._meta.get_field("archivedevent").column)}, '
+        f'{qn(archived_through._meta.get_field(archived_user_field).column)}) '
+        f'SELECT {qn(through._meta.get_field("event").column)}, {qn(through._meta.get_field(USER_FIELD).column)} '
+        f'FROM {qn(through._meta.db_table)} WHERE {qn(through._meta.get_field("event").column)} IN ({placeholders})'
+    )
+
+
+def archive_batch(cutoff, batch_size=500):
+    """
+    Move up to ``batch_size`` events dated before ``cutoff``, and their participant
+    rows, in one transaction. Returns how many were moved.
+    """
+    using = router.db_for_write(Event)
+    connection = connections[using]
+    through = Event.participants.through
+    with transaction.atomic(using=using):
+        # Locked so an RSVP can't add a participant row after it was copied.
+        rows = list(
+            Event.objects.using(using).select_for_update().filter(date__lt=cutoff)
+            .order_by('id').values(*FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [row['id'] for row in rows]
+        placeholders = ', '.join(['%s'] * len(ids))
+        user_ids = set(through.objects.using(using).filter(event_id__in=ids)
+                       .values_list(f'{USER_FIELD}_id', flat=True).distinct())
+
+        ArchivedEvent.objects.using(using).bulk_create([ArchivedEvent(**row) for row in rows])
+        with connection.cursor() as cursor:
+            cursor.execute(_copy_participants_sql(connection, placeholders), ids)
+        through.objects.using(using).filter(event_id__in=ids).delete()
+        # A plain DELETE: nothing else references an event once its participant rows
+        # are gone, and the post_delete receivers' work is done in bulk below.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(Event._meta.db_table)} WHERE id IN ({placeholders})', ids)
+
+        search.remove_events(ids)
+        counters.adjust('events', -len(ids))
+        scopes = [
+            pagecache.LIST_SCOPE,
+            *map(pagecache.event_scope, ids),
+            *map(pagecache.category_scope, {row['category_id'] for row in rows}),
+            *map(pagecache.user_scope, user_ids),
+        ]
+        transaction.on_commit(lambda: pagecache.bump(*scopes), using=using)
+    return len(ids)
+
+
+def archive_events(cutoff, batch_size=500):
+    """Archive every event dated before ``cutoff``, a batch per transaction. Returns how many moved."""
+    total = 0
+    while moved := archive_batch(cutoff, batch_size):
+        total += moved
+    return total
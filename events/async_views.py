@@ -0,0 +1,140 @@
+"""
+Native async versions of the hot read views, served instead of the sync ones when
+ASYNC_VIEWS is set and the site runs under ASGI (see config/asgi.py).
+
+They fetch everything with the async ORM before rendering, then hand Django a
+TemplateResponse that it renders in a worker thread, so a slow client never
+holds a thread while it waits.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views.generic import View
+
+from .counters import aget_counts
+from .models import ArchivedEvent, Category
+from .pagecache import (
+    LIST_SCOPE, PAGE_KEY, aget_versions, ahas_fragment, cache_alias, event_scope, get_cache, make_key, render,
+    replica_guard, timeout,
+)
+from .roles import aget_user_roles
+from .views import DashboardView, EventDetailView, EventListView, participants_paginator
+
+
+class AsyncPageCacheMixin:
+    """
+    ``AnonymousPageCacheMixin.get()`` for async views: the same keys, validators and
+    cached pages, with cache and database access awaited. Views build their response
+    in ``aget_response()``.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        versions = await aget_versions(*self.page_cache_scopes())
+        with replica_guard(versions):
+            if request.user.is_authenticated:
+                return await self.aget_response(request, *args, **kwargs)
+
+            key, etag, last_modified = self.page_validators(request, versions)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                cache = get_cache()
+                cached = await cache.aget(PAGE_KEY.format(key))
+                if cached is None:
+                    response = await self.aget_response(request, *args, **kwargs)
+                    await sync_to_async(render)(request, response)
+                    if response.status_code == 200:
+                        await cache.aset(PAGE_KEY.format(key), (response.content, response['Content-Type']), timeout())
+                else:
+                    content, content_type = cached
+                    response = HttpResponse(content, content_type=content_type)
+            return self.set_validators(response, etag, last_modified)
+
+    def page_cache_context(self, **context):
+        return {
+            'view': self,
+            'page_cache_alias': cache_alias(),
+            'page_cache_timeout': timeout(),
+            **context,
+        }
+
+
+class AsyncEventListView(AsyncPageCacheMixin, EventListView):
+    async def aget_response(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        version = (await aget_versions(LIST_SCOPE))[LIST_SCOPE]
+        table_cache_key = make_key(version, self.page_cache_params())
+        filters_cache_key = make_key(version, request.GET.get('category'))
+
+        # Fetched up front unless the fragments are cached. If one expires before the
+        # template renders it, the lazy page and queryset are fetched there instead.
+        page = self.get_page(self.object_list, self.get_paginate_by(self.object_list))
+        if not await ahas_fragment('event_table', table_cache_key):
+            await page.aload()
+        categories = Category.objects.all()
+        if not await ahas_fragment('event_category_options', filters_cache_key):
+            categories = [category async for category in categories]
+
+        return self.render_to_response(self.page_cache_context(
+            paginator=None,
+            page_obj=page,
+            is_paginated=page.has_other_pages,
+            object_list=page,
+            events=page,
+            categories=categories,
+            table_cache_key=table_cache_key,
+            filters_cache_key=filters_cache_key,
+        ))
+
+
+class AsyncEventDetailView(AsyncPageCacheMixin, EventDetailView):
+    async def aget_response(self, request, *args, **kwargs):
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs['pk'])
+        except self.model.DoesNotExist:
+            try:
+                self.object = await ArchivedEvent.objects.select_related('category').aget(pk=self.kwargs['pk'])
+            except ArchivedEvent.DoesNotExist:
+                raise Http404('No event found matching the query')
+
+        scope = event_scope(self.object.pk)
+        participants_cache_key = make_key((await aget_versions(scope))[scope])
+        participants_page = participants_paginator(self.object).page()
+        if not await ahas_fragment('event_participants', participants_cache_key):
+            await participants_page.aload()
+
+        context = self.page_cache_context(
+            object=self.object,
+            event=self.object,
+            participants_cache_key=participants_cache_key,
+            participants_page=participants_page,
+        )
+        if request.user.is_authenticated:
+            context['is_rsvped'] = await self.object.participants.filter(id=request.user.id).aexists()
+        return self.render_to_response(context)
+
+
+class AsyncDashboardView(DashboardView):
+    def dispatch(self, request, *args, **kwargs):
+        # LoginRequiredMixin reads request.user synchronously; get() checks it instead.
+        return View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        user = request.user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), self.get_login_url(), self.get_redirect_field_name())
+
+        roles = await aget_user_roles(user)
+        today = timezone.now().date()
+        context = {'view': self, **kwargs}
+        if 'Admin' in roles or 'Organizer' in roles:
+            names = ('users', 'events', 'categories') if 'Admin' in roles else ('events', 'categories')
+            totals = await aget_counts(*names)
+            context.update({f'total_{name}': count for name, count in totals.items()})
+            context['events'] = [event async for event in self.get_upcoming_events(today)]
+        else:
+            context['rsvp_events'] = [event async for event in user.rsvp_events.all()]
+        # Roles are memoized on the user now, so picking the template costs no query.
+        return self.render_to_response(context)
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+USER_CACHE_KEY = 'events:user:{}'
+
+
+def _cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def _timeout():
+    return getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+
+
+def invalidate_users(*user_ids):
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # A request racing the write could cache the old row again before it commits.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that caches the user it loads for each request, so with cached
+    sessions an authenticated request makes no queries before the view runs.
+
+    Entries are dropped whenever the user is saved or deleted (see signals.py),
+    which covers password changes (and so the session hash check) and deactivation.
+    """
+
+    def get_user(self, user_id):
+        key = _cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, _timeout())
+        return user
+
+    async def aget_user(self, user_id):
+        key = _cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, _timeout())
+        return user
@@ -0,0 +1,360 @@
+"""
+Local benchmark harness: a bulk data generator, scripted request scenarios, and
+a baseline comparison. Driven by ``manage.py generate_benchmark_data`` and
+``manage.py benchmark``.
+"""
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from asgiref.sync import async_to_sync
+from django.db import connection, connections, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import counters, pagecache, search
+from .models import Category, Event
+
+User = get_user_model()
+
+PREFIX = 'bench_'
+PASSWORD = 'benchpass'
+ROLE_USERS = {'Admin': 'bench_admin', 'Organizer': 'bench_organizer', 'Participant': 'bench_participant'}
+
+WORDS = (
+    'python', 'django', 'data', 'design', 'music', 'startup', 'health', 'cloud', 'security', 'art',
+    'community', 'robotics', 'finance', 'film', 'garden', 'chess', 'running', 'coffee', 'writing', 'games',
+)
+CITIES = ('Dhaka', 'Chittagong', 'Sylhet', 'Khulna', 'Rajshahi', 'Online')
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def clear():
+    """Delete everything a previous run generated."""
+    Event.objects.filter(name__startswith=PREFIX).delete()
+    Category.objects.filter(name__startswith=PREFIX).delete()
+    User.objects.filter(username__startswith=PREFIX).delete()
+
+
+def generate(users=100_000, events=50_000, categories=200, rsvps=2_000_000,
+             batch_size=5000, seed=0, log=print):
+    """
+    Bulk-insert a realistic dataset. Signals don't fire for bulk inserts, so the
+    denormalized counts, counters, search index and page cache are rebuilt at the end.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    password = make_password(PASSWORD)
+    groups = {name: Group.objects.get_or_create(name=name)[0] for name in ROLE_USERS}
+
+    for role, username in ROLE_USERS.items():
+        user, _ = User.objects.get_or_create(username=username, defaults={'email': f'{username}@example.com'})
+        user.set_password(PASSWORD)
+        user.is_active = True
+        user.save()
+        user.groups.add(groups[role])
+
+    start = User.objects.filter(username__startswith=f'{PREFIX}user').count()
+    for batch in _batches(range(start, start + users), batch_size):
+        User.objects.bulk_create([
+            User(username=f'{PREFIX}user{i}', email=f'{PREFIX}user{i}@example.com', password=password,
+                 first_name=rng.choice(WORDS).title(), is_active=True)
+            for i in batch
+        ])
+    user_ids = list(User.objects.filter(username__startswith=f'{PREFIX}user').values_list('pk', flat=True))
+    membership = User.groups.through
+    for batch in _batches(user_ids, batch_size):
+        membership.objects.bulk_create(
+            [membership(**{f'{User._meta.model_name}_id': pk, 'group_id': groups['Participant'].pk}) for pk in batch],
+            ignore_conflicts=True,
+        )
+    log(f'{len(user_ids)} users.')
+
+    Category.objects.bulk_create([
+        Category(name=f'{PREFIX}{rng.choice(WORDS)} {i}', description=' '.join(rng.choices(WORDS, k=12)))
+        for i in range(categories)
+    ])
+    category_ids = list(Category.objects.filter(name__startswith=PREFIX).values_list('pk', flat=True))
+    log(f'{len(category_ids)} categories.')
+
+    for batch in _batches(range(events), batch_size):
+        Event.objects.bulk_create([
+            Event(
+                name=f'{PREFIX}{" ".join(rng.choices(WORDS, k=3))} {i}',
+                description=' '.join(rng.choices(WORDS, k=40)),
+                date=today + timedelta(days=rng.randint(-365, 365)),
+                time=dtime(rng.randint(8, 21), rng.choice((0, 15, 30, 45))),
+                location=rng.choice(CITIES),
+                category_id=rng.choice(category_ids),
+            )
+            for i in batch
+        ])
+    event_ids = list(Event.objects.filter(name__startswith=PREFIX).values_list('pk', flat=True))
+    log(f'{len(event_ids)} events.')
+
+    # Skewed popularity: a few events draw most of the RSVPs.
+    weights = [1 / (rank + 1) for rank in range(len(event_ids))]
+    per_event = dict.fromkeys(event_ids, 0)
+    for event_id in rng.choices(event_ids, weights, k=rsvps):
+        per_event[event_id] += 1
+    through = Event.participants.through
+    user_field = f'{User._meta.model_name}_id'
+    rows = (
+        through(event_id=event_id, **{user_field: user_id})
+        for event_id, count in per_event.items() if count
+        for user_id in rng.sample(user_ids, min(count, len(user_ids)))
+    )
+    total = 0
+    for batch in _batches(rows, batch_size):
+        through.objects.bulk_create(batch, ignore_conflicts=True)
+        total += len(batch)
+    log(f'{total} RSVPs.')
+
+    Event.objects.recount_participants()
+    counters.recount()
+    search.rebuild_index()
+    pagecache.bump(pagecache.LIST_SCOPE)
+
+
+class Scenario:
+    """One scripted request. ``request(client, state)`` returns the response."""
+
+    def __init__(self, name, role, request, writes=False):
+        self.name = name
+        self.role = role
+        self.request = request
+        self.writes = writes
+
+
+def _sample_event(state):
+    return state['rng'].choice(state['event_ids'])
+
+
+def _rsvp(client, state):
+    # A different event each time, so the insert path is measured rather than "already registered".
+    return client.post(reverse('rsvp_event', args=[_sample_event(state)]), HTTP_ACCEPT='application/json')
+
+
+def _signup(client, state):
+    n = next(state['counter'])
+    return client.post(reverse('sign_up'), {
+        'username': f'{PREFIX}signup{n}', 'email': f'{PREFIX}signup{n}@example.com',
+        'first_name': 'Bench', 'last_name': 'Mark',
+        'password1': 'A-long-bench-password-1', 'password2': 'A-long-bench-password-1',
+    })
+
+
+def scenarios(state):
+    today = date.today()
+    category = state['category_id']
+    search_term = state['search_term']
+    list_filters = {
+        'event_list': {},
+        'event_list_category': {'category': category},
+        'event_list_dates': {'start_date': today.isoformat(), 'end_date': (today + timedelta(days=30)).isoformat()},
+        'event_list_search': {'search': search_term},
+        'event_list_popular': {'sort': 'popular'},
+    }
+    items = []
+    for name, params in list_filters.items():
+        items.append(Scenario(name, None, lambda c, s, p=params: c.get(reverse('event_list'), p)))
+        items.append(Scenario(f'{name}:participant', 'Participant',
+                              lambda c, s, p=params: c.get(reverse('event_list'), p)))
+    items += [
+        Scenario('event_detail', None, lambda c, s: c.get(reverse('event_detail', args=[_sample_event(s)]))),
+        Scenario('event_detail:participant', 'Participant',
+                 lambda c, s: c.get(reverse('event_detail', args=[_sample_event(s)]))),
+        Scenario('dashboard:admin', 'Admin', lambda c, s: c.get(reverse('dashboard'))),
+        Scenario('dashboard:organizer', 'Organizer', lambda c, s: c.get(reverse('dashboard'))),
+        Scenario('dashboard:participant', 'Participant', lambda c, s: c.get(reverse('dashboard'))),
+        Scenario('rsvp', 'Participant', _rsvp, writes=True),
+        Scenario('signup', None, _signup, writes=True),
+    ]
+    return items
+
+
+class HTTPClient:
+    """Minimal stand-in for the test client that sends GETs to a running server (e.g. gunicorn)."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def get(self, path, params=None):
+        query = '?' + urllib.parse.urlencode(params) if params else ''
+        with urllib.request.urlopen(self.base_url + path + query) as response:
+            response.read()
+            return response
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+    return {'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+
+def _shares(total, workers):
+    return [total // workers + (i < total % workers) for i in range(workers)]
+
+
+def _client(scenario, base_url=None):
+    if base_url:
+        return HTTPClient(base_url)
+    client = Client()
+    if scenario.role:
+        client.force_login(User.objects.get(username=ROLE_USERS[scenario.role]))
+    return client
+
+
+def _run_serial(scenario, state, iterations, warmup):
+    """One test client, writes rolled back. Returns ``(latencies, seconds, queries)``."""
+    client = _client(scenario)
+    latencies, queries = [], []
+    with transaction.atomic():
+        for i in range(warmup + iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                scenario.request(client, state)
+                elapsed = time.perf_counter() - start
+            if i >= warmup:
+                latencies.append(elapsed * 1000)
+                queries.append(len(ctx.captured_queries))
+        transaction.set_rollback(True)
+    return latencies, sum(latencies) / 1000, queries
+
+
+def _run_threads(scenario, state, iterations, warmup, concurrency, base_url=None):
+    """``concurrency`` WSGI clients in threads. Returns ``(latencies, seconds)``."""
+    clients = [_client(scenario, base_url) for _ in range(concurrency)]
+    for _ in range(warmup):
+        scenario.request(clients[0], state)
+
+    def worker(client, count):
+        latencies = []
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                scenario.request(client, state)
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connections.close_all()
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = sum(pool.map(worker, clients, _shares(iterations, concurrency)), [])
+    return latencies, time.perf_counter() - start
+
+
+async def _run_async(scenario, state, iterations, warmup, concurrency):
+    """``concurrency`` ASGI clients on one event loop. Returns ``(latencies, seconds)``."""
+    clients = [AsyncClient() for _ in range(concurrency)]
+    if scenario.role:
+        user = await User.objects.aget(username=ROLE_USERS[scenario.role])
+        for client in clients:
+            await client.aforce_login(user)
+    for _ in range(warmup):
+        await scenario.request(clients[0], state)
+
+    async def worker(client, count):
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            await scenario.request(client, state)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*map(worker, clients, _shares(iterations, concurrency)))
+    return sum(latencies, []), time.perf_counter() - start
+
+
+def run(iterations=50, warmup=5, only=None, base_url=None, seed=0, asgi=False, concurrency=1):
+    """
+    Run every scenario and return ``{name: {'rps', 'p50', 'p95', 'p99', 'queries'}}``
+    (latencies in ms). Writes are rolled back.
+
+    With ``asgi`` requests go through Django's ASGI handler (set ASYNC_VIEWS to get
+    the async views), with ``concurrency`` clients in flight at once (threads for
+    WSGI). Those runs, and runs against ``base_url``, skip write scenarios and
+    report no query counts; ``base_url`` runs also skip logged-in scenarios.
+    """
+    rng = random.Random(seed)
+    event_ids = list(Event.objects.values_list('pk', flat=True)[:10000])
+    if not event_ids:
+        raise ValueError('No events to benchmark; run generate_benchmark_data first.')
+    state = {
+        'rng': rng,
+        'event_ids': event_ids,
+        'category_id': Category.objects.values_list('pk', flat=True).first(),
+        'search_term': rng.choice(WORDS),
+        'counter': itertools.count(int(time.time())),
+    }
+    serial = not (base_url or asgi or concurrency > 1)
+
+    results = {}
+    for scenario in scenarios(state):
+        if only and not any(scenario.name.startswith(name) for name in only):
+            continue
+        if (scenario.writes and not serial) or (scenario.role and base_url):
+            continue
+        queries = None
+        if serial:
+            latencies, seconds, queries = _run_serial(scenario, state, iterations, warmup)
+        elif asgi:
+            latencies, seconds = async_to_sync(_run_async)(scenario, state, iterations, warmup, concurrency)
+        else:
+            latencies, seconds = _run_threads(scenario, state, iterations, warmup, concurrency, base_url)
+
+        results[scenario.name] = {
+            'rps': len(latencies) / seconds,
+            **percentiles(latencies),
+            'queries': max(queries) if queries else None,
+            'mean_queries': statistics.mean(queries) if queries else None,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Regressions against ``baseline``: p95 latency or throughput worse by more than
+    ``tolerance``, or any increase in the maximum query count.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current['p95'] > previous['p95'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {previous["p95"]:.1f}ms -> {current["p95"]:.1f}ms')
+        if current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f'{name}: throughput {previous["rps"]:.1f}/s -> {current["rps"]:.1f}/s')
+        if current['queries'] is not None and previous.get('queries') is not None \
+                and current['queries'] > previous['queries']:
+            regressions.append(f'{name}: queries {previous["queries"]} -> {current["queries"]}')
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+from .pagecache import cache_alias
+
+
+@register(Tags.caches)
+def check_page_cache_is_shared(app_configs, **kwargs):
+    # Version bumps only reach the worker that made them when each has its own cache.
+    if getattr(settings, 'WEB_CONCURRENCY', 1) > 1 and isinstance(caches[cache_alias()], LocMemCache):
+        return [Warning(
+            f'The page cache ("{cache_alias()}") is per-process memory but WEB_CONCURRENCY is '
+            f'{settings.WEB_CONCURRENCY}: other workers serve stale pages and feeds for up to PAGE_CACHE_TIMEOUT.',
+            hint='Set REDIS_URL, or PAGE_CACHE_BACKEND=file for workers on one host.',
+            id='events.W001',
+        )]
+    return []
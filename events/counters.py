@@ -0,0 +1,80 @@
+"""
+Dashboard totals. With a SHARED_CACHE they are cached and adjusted on every
+create/delete; with per-process caches each worker would only see its own
+adjustments, so they are counted from the tables instead.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+COUNTER_CACHE_KEY = 'events:counter:{}'
+
+# Counter name -> model label
+COUNTERS = {
+    'users': settings.AUTH_USER_MODEL,
+    'events': 'events.Event',
+    'categories': 'events.Category',
+}
+
+
+def _cache_key(name):
+    return COUNTER_CACHE_KEY.format(name)
+
+
+def _shared():
+    return getattr(settings, 'SHARED_CACHE', False)
+
+
+def _timeout():
+    # Entries expire after this long so a full recount heals any drift on its own.
+    return getattr(settings, 'COUNTER_CACHE_TIMEOUT', 3600)
+
+
+def recount(*names):
+    names = names or tuple(COUNTERS)
+    totals = {name: apps.get_model(COUNTERS[name]).objects.count() for name in names}
+    if _shared():
+        cache.set_many({_cache_key(name): total for name, total in totals.items()}, _timeout())
+    return totals
+
+
+def get_counts(*names):
+    """Return ``{name: total}``, counting only the totals missing from the cache."""
+    if not _shared():
+        return recount(*names)
+    cached = cache.get_many([_cache_key(name) for name in names])
+    totals = {name: cached.get(_cache_key(name)) for name in names}
+    missing = [name for name, total in totals.items() if total is None]
+    if missing:
+        totals.update(recount(*missing))
+    return totals
+
+
+async def aget_counts(*names):
+    """``get_counts()`` for async views; misses are counted with ``acount()``."""
+    cached = await cache.aget_many([_cache_key(name) for name in names]) if _shared() else {}
+    totals = {name: cached.get(_cache_key(name)) for name in names}
+    missing = {name: await apps.get_model(COUNTERS[name]).objects.acount()
+               for name, total in totals.items() if total is None}
+    if missing and _shared():
+        await cache.aset_many({_cache_key(name): total for name, total in missing.items()}, _timeout())
+    totals.update(missing)
+    return totals
+
+
+def adjust(name, delta):
+    """
+    Apply ``delta`` to a cached total once the current transaction commits.
+
+    A missing entry is left alone: the next read recounts it from the table.
+    """
+    if not _shared():
+        return
+
+    def apply():
+        try:
+            cache.incr(_cache_key(name), delta)
+        except ValueError:
+            pass
+    transaction.on_commit(apply)
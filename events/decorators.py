@@ -1,5 +1,6 @@
 from django.http import HttpResponse
 from django.shortcuts import redirect
+from .roles import has_role
 
 def unauthenticated_user(view_func):
     def wrapper_func(request, *args, **kwargs):
@@ -12,11 +13,7 @@ def unauthenticated_user(view_func):
 def allowed_users(allowed_roles=[]):
     def decorator(view_func):
         def wrapper_func(request, *args, **kwargs):
-            group = None
-            if request.user.groups.exists():
-                group = request.user.groups.all()[0].name
-            
-            if group in allowed_roles or request.user.is_superuser:
+            if has_role(request.user, *allowed_roles) or request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
             else:
                 return HttpResponse('You are not authorized to view this page')
@@ -25,11 +22,7 @@ def allowed_users(allowed_roles=[]):
 
 def admin_only(view_func):
     def wrapper_func(request, *args, **kwargs):
-        group = None
-        if request.user.groups.exists():
-            group = request.user.groups.all()[0].name
-        
-        if group == 'Admin' or request.user.is_superuser:
+        if has_role(request.user, 'Admin') or request.user.is_superuser:
             return view_func(request, *args, **kwargs)
         else:
             return redirect('dashboard')
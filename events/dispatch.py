@@ -0,0 +1,64 @@
+"""
+Side effects of a write (confirmation emails and the like), deferred until the
+write commits.
+
+Signal receivers call ``defer()`` with keyed payloads. Nothing runs inside the
+writing transaction, repeats of a key within one transaction run once, and work
+deferred in a transaction or savepoint that rolls back is dropped with it.
+"""
+import weakref
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# The open batch of each database connection (connections are per thread).
+_batches = weakref.WeakKeyDictionary()
+
+
+class Batch:
+    """Work deferred during one transaction, grouped by handler and coalesced by key."""
+
+    def __init__(self):
+        self.pending = {}
+        self.done = set()
+        self.closed = False
+
+    def collect(self, handler, items):
+        pending = self.pending.setdefault(handler, {})
+        for key, payload in items.items():
+            if (handler, key) not in self.done:
+                pending.setdefault(key, payload)
+
+    def flush(self):
+        # Runs once the transaction has committed; later defer() calls start a new batch.
+        self.closed = True
+        pending, self.pending = self.pending, {}
+        for handler, items in pending.items():
+            self.done.update((handler, key) for key in items)
+            if items:
+                handler(list(items.values()))
+
+
+def _open_batch(connection):
+    batch = _batches.get(connection)
+    if batch is None or batch.closed:
+        batch = _batches[connection] = Batch()
+    return batch
+
+
+def defer(handler, items, using=None):
+    """
+    Call ``handler(payloads)`` after the current transaction on ``using`` commits
+    (at once in autocommit mode).
+
+    ``items`` maps a key to its payload, e.g. ``{(event_id, user_id): ...}``. Keys
+    already deferred in the same transaction are dropped, so the handler sees each
+    one once, with its first payload. Handlers should re-check the database, since
+    what they were deferred for may have been undone before the commit.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    batch = _open_batch(connections[using])
+    items = dict(items)
+    # Both callbacks are discarded with the (savepoint) transaction they were
+    # registered in, so rolled-back items never reach the batch.
+    transaction.on_commit(lambda: batch.collect(handler, items), using=using)
+    transaction.on_commit(batch.flush, using=using, robust=True)
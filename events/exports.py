@@ -0,0 +1,87 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+# Columns of each export, as values_list() lookups
+EVENT_COLUMNS = ('id', 'name', 'date', 'time', 'location', 'category__name', 'participant_count')
+PARTICIPANT_COLUMNS = ('id', 'username', 'email', 'first_name', 'last_name')
+
+# ?format= value -> (content type, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+class Echo:
+    """File-like object for csv.writer that hands back each line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def encoder(fmt, columns):
+    """``(encode, header)``: a function turning a row tuple into a line, and the first line or None."""
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        return writer.writerow, writer.writerow(columns)
+    return (lambda row: json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'), None
+
+
+def _lines(encode, header, rows, batch, footer=None):
+    buffer = [header] if header else []
+    for row in rows:
+        buffer.append(encode(row))
+        if len(buffer) >= batch:
+            yield ''.join(buffer)
+            buffer = []
+    if footer:
+        buffer.append(footer)
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def _alines(encode, header, rows, columns, batch, footer=None):
+    buffer = [header] if header else []
+    async for row in rows:
+        buffer.append(encode(tuple(row[column] for column in columns)))
+        if len(buffer) >= batch:
+            yield ''.join(buffer)
+            buffer = []
+    if footer:
+        buffer.append(footer)
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_lines(queryset, columns, encode, header=None, footer=None):
+    """
+    The rows of ``queryset`` as text, ``encode(row tuple)`` per row between ``header``
+    and ``footer``, fetching ``chunk_size()`` rows at a time with a server-side cursor
+    where the backend has one, so memory use doesn't grow with the result.
+    """
+    size = chunk_size()
+    if getattr(settings, 'ASYNC_VIEWS', False):
+        # Under ASGI a sync iterator would be read into memory in full first. values()
+        # rather than values_list(), whose aiterator() runs the query on the event loop.
+        rows = queryset.values(*columns).aiterator(chunk_size=size)
+        return _alines(encode, header, rows, columns, size, footer)
+    rows = queryset.values_list(*columns).iterator(chunk_size=size)
+    return _lines(encode, header, rows, size, footer)
+
+
+def stream(queryset, columns, fmt, filename):
+    """Stream ``queryset`` as ``fmt`` (see ``stream_lines()``)."""
+    content_type, extension = FORMATS[fmt]
+    encode, header = encoder(fmt, columns)
+    content = stream_lines(queryset, columns, encode, header)
+    response = StreamingHttpResponse(content, content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -0,0 +1,123 @@
+"""
+iCalendar feeds: the events a user RSVPed to (behind a secret token) and each
+category's events, for calendar apps to subscribe to.
+
+Calendar apps poll every few minutes. A feed's ETag comes from its version scope
+(see pagecache.py, bumped in signals.py), so polls of an unchanged feed get a 304
+without querying events; a changed feed is streamed from values() rows.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import exports
+from .models import CustomUser, Event, new_calendar_token
+from .pagecache import get_versions, make_key
+
+COLUMNS = ('id', *Event.FEED_FIELDS)
+
+# Events have no end time; calendar apps show them this long.
+DURATION = 'PT1H'
+
+
+def reset_user_token(user):
+    """Give ``user`` a new feed URL; the old one stops working."""
+    # Random rather than derived from the user, so a leaked link can be revoked.
+    user.calendar_token = new_calendar_token()
+    user.save(update_fields=['calendar_token'])
+
+
+def user_from_token(token):
+    """The id of the active user ``token`` belongs to, or None."""
+    return CustomUser.objects.filter(calendar_token=token, is_active=True).values_list('pk', flat=True).first()
+
+
+def window_start():
+    """Feeds list events from this date on."""
+    return timezone.localdate() - timedelta(days=getattr(settings, 'CALENDAR_FEED_PAST_DAYS', 30))
+
+
+def validators(request, scope):
+    """``(ETag, Last-Modified timestamp)`` of a feed at its scope's current version."""
+    version = get_versions(scope)[scope]
+    today = timezone.localdate()
+    # The window moves at midnight without a version bump.
+    midnight = timezone.make_aware(datetime.combine(today, datetime.min.time())).timestamp()
+    key = make_key(request.get_host(), request.path, version, today)
+    return f'"{key}"', int(max(version, midnight))
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """``line`` as CRLF-terminated lines of at most 75 octets (RFC 5545, 3.1)."""
+    if len(line.encode()) <= 75:
+        return line + '\r\n'
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            parts.append(''.join(current))
+            current, size = [' '], 1
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def encoder(request, stamp):
+    """A function turning a ``COLUMNS`` row into a VEVENT."""
+    host = request.get_host().partition(':')[0]
+    dtstamp = _utc(datetime.fromtimestamp(stamp, dt_timezone.utc))
+
+    def encode(row):
+        pk, name, description, date, time, location = row
+        # Dates and times are stored in TIME_ZONE.
+        start = timezone.make_aware(datetime.combine(date, time))
+        return ''.join(map(fold, (
+            'BEGIN:VEVENT',
+            f'UID:event-{pk}@{host}',
+            f'DTSTAMP:{dtstamp}',
+            f'DTSTART:{_utc(start)}',
+            f'DURATION:{DURATION}',
+            f'SUMMARY:{escape(name)}',
+            f'DESCRIPTION:{escape(description)}',
+            f'LOCATION:{escape(location)}',
+            f'URL:{request.build_absolute_uri(reverse("event_detail", args=[pk]))}',
+            'END:VEVENT',
+        )))
+    return encode
+
+
+def stream(request, queryset, title, stamp):
+    """The events of ``queryset`` within the feed window, streamed as an iCalendar feed."""
+    queryset = queryset.filter(date__gte=window_start()).order_by('date', 'time', 'id')
+    header = ''.join(map(fold, (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Event Management//Calendar feed//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{escape(title)}',
+    )))
+    content = exports.stream_lines(queryset, COLUMNS, encoder(request, stamp), header, fold('END:VCALENDAR'))
+    response = StreamingHttpResponse(content, content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="calendar.ics"'
+    return response
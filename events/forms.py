@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.models import Group
 from .models import Category, Event
 
 User = get_user_model()
@@ -17,7 +18,7 @@ class CategoryForm(forms.ModelForm):
 class EventForm(forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['name', 'description', 'date', 'time', 'location', 'category', 'event_image']
+        fields = ['name', 'description', 'date', 'time', 'location', 'category', 'capacity', 'event_image']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'w-full px-3 py-2 border rounded'}),
             'description': forms.Textarea(attrs={'class': 'w-full px-3 py-2 border rounded', 'rows': 3}),
@@ -25,9 +26,34 @@ class EventForm(forms.ModelForm):
             'time': forms.TimeInput(attrs={'class': 'w-full px-3 py-2 border rounded', 'type': 'time'}),
             'location': forms.TextInput(attrs={'class': 'w-full px-3 py-2 border rounded'}),
             'category': forms.Select(attrs={'class': 'w-full px-3 py-2 border rounded'}),
+            'capacity': forms.NumberInput(attrs={'class': 'w-full px-3 py-2 border rounded', 'min': 1}),
             'event_image': forms.FileInput(attrs={'class': 'w-full px-3 py-2 border rounded'}),
         }
 
+class BulkRSVPForm(forms.Form):
+    users = forms.CharField(
+        required=False,
+        label='Usernames or emails',
+        help_text='One per line or separated by commas.',
+        widget=forms.Textarea(attrs={'class': 'w-full px-3 py-2 border rounded', 'rows': 6}),
+    )
+    groups = forms.ModelMultipleChoiceField(
+        queryset=Group.objects.all(),
+        required=False,
+        label='Invite whole groups',
+        widget=forms.SelectMultiple(attrs={'class': 'w-full px-3 py-2 border rounded'}),
+    )
+
+    def clean_users(self):
+        raw = self.cleaned_data['users'].replace(',', '\n')
+        return [value.strip() for value in raw.splitlines() if value.strip()]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('users') and not cleaned_data.get('groups'):
+            raise forms.ValidationError('Enter at least one user or pick a group.')
+        return cleaned_data
+
 class UserSignupForm(UserCreationForm):
     first_name = forms.CharField(widget=forms.TextInput(attrs={'class': 'w-full px-3 py-2 border rounded'}))
     last_name = forms.CharField(widget=forms.TextInput(attrs={'class': 'w-full px-3 py-2 border rounded'}))
@@ -0,0 +1,181 @@
+import hashlib
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import backends, pagecache
+
+# Variant widths generated for each image field, in pixels
+VARIANT_WIDTHS = {
+    'event_image': (320, 640, 1280),
+    'profile_picture': (64, 128, 256),
+}
+
+# (file extension, Pillow format, MIME type), preferred first
+VARIANT_FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+
+# Formats an original is kept in when it has to be rewritten; anything else becomes JPEG.
+ORIGINAL_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+
+# Metadata that Pillow carries in image.info and that we never want to publish
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+UNREADABLE = (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError)
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def image_fields(model):
+    return [name for name in VARIANT_WIDTHS if hasattr(model, variants_field(name))]
+
+
+def max_dimension():
+    return getattr(settings, 'IMAGE_MAX_DIMENSION', 2048)
+
+
+def quality():
+    return getattr(settings, 'IMAGE_QUALITY', 82)
+
+
+def _flatten(image, fmt):
+    if fmt == 'JPEG':
+        return image.convert('RGB') if image.mode not in ('RGB', 'L') else image
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        return image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def _encode(image, fmt):
+    # Pillow only writes EXIF/XMP when asked to, so re-encoding drops all metadata.
+    buffer = BytesIO()
+    _flatten(image, fmt).save(buffer, fmt, quality=quality(), optimize=True)
+    return buffer.getvalue()
+
+
+def _needs_rewrite(image):
+    limit = max_dimension()
+    return (
+        image.width > limit or image.height > limit
+        or any(key in image.info for key in METADATA_KEYS)
+        or bool(image.getexif())
+    )
+
+
+def process_file(field_file, widths, rewrite=True):
+    """
+    Strip metadata from and cap the size of ``field_file``, then write WebP and JPEG
+    variants next to it.
+
+    A rewritten original and every variant get a name containing a hash of the
+    cleaned original's bytes, so they can be cached forever and an unchanged image
+    is never written twice. Returns ``(name, variants)``, where ``name`` is the
+    (possibly new) name of the original.
+    """
+    storage = field_file.storage
+    name = field_file.name
+    with storage.open(name, 'rb') as f:
+        data = f.read()
+    image = Image.open(BytesIO(data))
+    image.load()
+    source_format = image.format
+
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+
+    needs_rewrite = rewrite and _needs_rewrite(image)
+    image = ImageOps.exif_transpose(image)
+
+    if needs_rewrite:
+        limit = max_dimension()
+        image.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+        fmt = source_format if source_format in ORIGINAL_FORMATS else 'JPEG'
+        data = _encode(image, fmt)
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        name = storage.save(posixpath.join(directory, f'{stem}.{digest}{ORIGINAL_FORMATS[fmt]}'), ContentFile(data))
+    else:
+        digest = hashlib.sha256(data).hexdigest()[:12]
+
+    variants = {'source': name, 'width': image.width, 'height': image.height}
+    sizes = [width for width in widths if width < image.width] or [image.width]
+    for ext, fmt, _ in VARIANT_FORMATS:
+        variants[ext] = []
+        for width in sizes:
+            variant_name = posixpath.join(directory, 'variants', f'{stem}.{digest}.{width}w.{ext}')
+            if not storage.exists(variant_name):
+                resized = image.copy()
+                resized.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+                variant_name = storage.save(variant_name, ContentFile(_encode(resized, fmt)))
+            variants[ext].append([variant_name, width])
+    return name, variants
+
+
+def process_instance(instance, field_name, memo=None):
+    """
+    Process one image field of ``instance`` and store the result. Unreadable or
+    missing files are recorded with no variants, so templates fall back to the
+    original and the row is not retried forever. Returns True if variants were made.
+    """
+    field_file = getattr(instance, field_name)
+    old_name = field_file.name
+    default = instance._meta.get_field(field_name).get_default()
+    memo = {} if memo is None else memo
+
+    if old_name not in memo:
+        try:
+            # The shared default image is never rewritten or renamed.
+            memo[old_name] = process_file(field_file, VARIANT_WIDTHS[field_name], rewrite=old_name != default)
+        except UNREADABLE:
+            memo[old_name] = (old_name, {'source': old_name})
+    name, variants = memo[old_name]
+
+    model = type(instance)
+    # Only if the field still points at the file we processed; a newer upload will be
+    # picked up on its own.
+    updated = model._default_manager.filter(pk=instance.pk, **{field_name: old_name}).update(
+        **{field_name: name, variants_field(field_name): variants}
+    )
+    if updated:
+        setattr(instance, field_name, name)
+        setattr(instance, variants_field(field_name), variants)
+        if name != old_name and old_name != default:
+            field_file.storage.delete(old_name)
+        if model._meta.label == 'events.Event':
+            pagecache.bump(pagecache.event_scope(instance.pk))
+        elif model._meta.label == settings.AUTH_USER_MODEL:
+            # update() skips post_save, which drops the cached request.user.
+            backends.invalidate_users(instance.pk)
+    return 'jpg' in variants
+
+
+def process_pending(model, field_name, batch_size=100, everything=False, memo=None):
+    """
+    Process rows of ``model`` whose ``field_name`` has no variants yet, or every row
+    with ``everything`` (a backfill). Returns ``(processed, with_variants)``.
+    """
+    memo = {} if memo is None else memo
+    queryset = model._default_manager.only('pk', field_name, variants_field(field_name)).order_by('pk')
+    if not everything:
+        queryset = queryset.filter(**{variants_field(field_name): {}})
+
+    processed = done = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return processed, done
+        for instance in batch:
+            processed += 1
+            done += process_instance(instance, field_name, memo)
+        last_pk = batch[-1].pk
+
+
+def srcset(field_file, variants, ext):
+    return ', '.join(f'{field_file.storage.url(name)} {width}w' for name, width in variants.get(ext, []))
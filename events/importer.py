@@ -0,0 +1,230 @@
+"""
+Bulk event import for partner catalogs, driven by ``manage.py import_events``.
+
+Rows stream from the file through generators (read, clean, batch) and are written
+a batch per transaction, so memory use depends on the batch size, not the file.
+"""
+import csv
+import itertools
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import counters, pagecache, search
+from .forms import EventForm
+from .models import ArchivedEvent, Category, Event
+from .rsvp import USER_FIELD
+
+# CSV columns; iCalendar properties are mapped onto the same names.
+COLUMNS = ('external_id', 'name', 'description', 'date', 'time', 'location', 'category', 'capacity')
+
+# EventForm fields whose clean() rules apply to every row. The category is
+# resolved from a name instead, without a query per row.
+FORM_FIELDS = {name: EventForm.base_fields[name] for name in ('name', 'description', 'date', 'time', 'location', 'capacity')}
+
+# Fields an upsert overwrites on an existing event
+UPDATE_FIELDS = ['name', 'description', 'date', 'time', 'location', 'category', 'capacity']
+
+EXTERNAL_ID_MAX_LENGTH = Event._meta.get_field('external_id').max_length
+
+
+class RowError(Exception):
+    def __init__(self, line, errors):
+        super().__init__(f'line {line}: ' + '; '.join(f'{field}: {" ".join(messages)}' for field, messages in errors.items()))
+        self.line = line
+        self.errors = errors
+
+
+# Readers: yield (line number, {column: raw string})
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, {column: (row.get(column) or '').strip() for column in COLUMNS}
+
+
+def _unfold(lines):
+    # RFC 5545 long lines continue on lines starting with a space or tab.
+    current = None
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current = (current[0], current[1] + line[1:])
+            continue
+        if current is not None:
+            yield current
+        current = (number, line)
+    if current is not None:
+        yield current
+
+
+def _ics_text(value):
+    return re.sub(r'\\([\\;,nN])', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value).strip()
+
+
+def _ics_start(params, value):
+    """``(date, time)`` strings for a DTSTART, in TIME_ZONE; raw on anything unparseable."""
+    value = value.strip()
+    try:
+        if 'T' not in value:
+            # All-day event
+            return date(int(value[:4]), int(value[4:6]), int(value[6:8])).isoformat(), '00:00:00'
+        start = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+        tzid = next((param[5:].strip('"') for param in params if param.upper().startswith('TZID=')), None)
+        if value.endswith('Z'):
+            start = start.replace(tzinfo=dt_timezone.utc)
+        elif tzid:
+            start = start.replace(tzinfo=ZoneInfo(tzid))
+        if start.tzinfo:
+            start = start.astimezone(ZoneInfo(settings.TIME_ZONE))
+    except (ValueError, ZoneInfoNotFoundError):
+        return value, ''
+    return start.date().isoformat(), start.time().isoformat()
+
+
+def read_ics(lines):
+    event = None
+    for number, line in _unfold(lines):
+        name, _, value = line.partition(':')
+        name, *params = name.split(';')
+        name = name.upper()
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event, start = {}, number
+        elif name == 'END' and value.upper() == 'VEVENT' and event is not None:
+            row = {
+                'external_id': event.get('UID', ([], ''))[1].strip(),
+                'name': _ics_text(event.get('SUMMARY', ([], ''))[1]),
+                'description': _ics_text(event.get('DESCRIPTION', ([], ''))[1]),
+                'location': _ics_text(event.get('LOCATION', ([], ''))[1]),
+                'category': _ics_text(re.split(r'(?<!\\),', event.get('CATEGORIES', ([], ''))[1])[0]),
+                'capacity': '',
+            }
+            row['date'], row['time'] = _ics_start(*event['DTSTART']) if 'DTSTART' in event else ('', '')
+            yield start, row
+            event = None
+        elif event is not None:
+            event.setdefault(name, (params, value))
+
+
+READERS = {'csv': read_csv, 'ics': read_ics}
+
+
+class CategoryMap:
+    """Category name -> id, loaded once; unknown names are created or rejected."""
+
+    def __init__(self, create=False, default=None):
+        self.ids = {name.casefold(): pk for pk, name in Category.objects.values_list('pk', 'name')}
+        self.create = create
+        self.default = default
+
+    def resolve(self, name):
+        name = name or self.default or ''
+        key = name.casefold()
+        if key not in self.ids:
+            if not name or not self.create:
+                raise ValidationError('Unknown category.' if name else 'This field is required.')
+            self.ids[key] = Category.objects.create(name=name, description='').pk
+        return self.ids[key]
+
+
+def clean(rows, categories):
+    """Yield ``(line, Event)`` for valid rows and ``RowError`` for the others."""
+    for line, raw in rows:
+        values, errors = {}, {}
+        for name, field in FORM_FIELDS.items():
+            try:
+                values[name] = field.clean(raw.get(name, ''))
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        try:
+            values['category_id'] = categories.resolve(raw.get('category', ''))
+        except ValidationError as exc:
+            errors['category'] = exc.messages
+        external_id = raw.get('external_id') or None
+        if external_id and len(external_id) > EXTERNAL_ID_MAX_LENGTH:
+            errors['external_id'] = [f'Ensure this value has at most {EXTERNAL_ID_MAX_LENGTH} characters.']
+        if errors:
+            yield RowError(line, errors)
+        else:
+            yield line, Event(external_id=external_id, **values)
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def write_batch(events):
+    """
+    Insert ``events``, updating those whose external_id already exists, in one
+    transaction. Returns ``(created, updated, archived)``, the last being rows left
+    alone because their event has been archived.
+    """
+    # Last row wins for an external_id repeated within the batch.
+    keyed = {event.external_id: event for event in events if event.external_id}
+    unkeyed = [event for event in events if not event.external_id]
+    with transaction.atomic():
+        # A catalog that still lists an archived event doesn't bring it back.
+        archived = list(ArchivedEvent.objects.filter(external_id__in=list(keyed)).values_list('external_id', flat=True))
+        for external_id in archived:
+            del keyed[external_id]
+        existing = {
+            external_id: (pk, category_id) for external_id, pk, category_id
+            in Event.objects.filter(external_id__in=list(keyed)).values_list('external_id', 'pk', 'category_id')
+        }
+        if keyed:
+            Event.objects.bulk_create(
+                keyed.values(), update_conflicts=True, unique_fields=['external_id'], update_fields=UPDATE_FIELDS,
+            )
+        Event.objects.bulk_create(unkeyed)
+        pks = [event.pk for event in unkeyed if event.pk is not None]
+        pks += Event.objects.filter(external_id__in=list(keyed)).values_list('pk', flat=True)
+
+        # What the post_save receivers would have done for each row
+        search.index_events(pks)
+        created = len(keyed) + len(unkeyed) - len(existing)
+        counters.adjust('events', created)
+        updated_ids = [pk for pk, _ in existing.values()]
+        category_ids = {event.category_id for event in (*keyed.values(), *unkeyed)} | {category_id for _, category_id in existing.values()}
+        user_ids = set(Event.participants.through.objects.filter(event_id__in=updated_ids)
+                       .values_list(f'{USER_FIELD}_id', flat=True)) if updated_ids else set()
+        scopes = [
+            pagecache.LIST_SCOPE,
+            *map(pagecache.event_scope, updated_ids),
+            *map(pagecache.category_scope, category_ids),
+            *map(pagecache.user_scope, user_ids),
+        ]
+        transaction.on_commit(lambda: pagecache.bump(*scopes))
+    return created, len(existing), len(archived)
+
+
+def import_events(lines, fmt, batch_size=1000, create_categories=False, default_category=None, on_error=None):
+    """
+    Import events from the ``lines`` of a CSV or iCalendar file. Invalid rows are
+    skipped and passed to ``on_error(RowError)``; rows for archived events are
+    skipped silently. Returns ``(created, updated, skipped)``.
+    """
+    categories = CategoryMap(create=create_categories, default=default_category)
+    created = updated = skipped = 0
+
+    def valid(results):
+        nonlocal skipped
+        for result in results:
+            if isinstance(result, RowError):
+                skipped += 1
+                if on_error:
+                    on_error(result)
+            else:
+                yield result[1]
+
+    for batch in _batches(valid(clean(READERS[fmt](lines), categories)), batch_size):
+        batch_created, batch_updated, batch_archived = write_batch(batch)
+        created += batch_created
+        updated += batch_updated
+        skipped += batch_archived
+    return created, updated, skipped
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+
+from events.models import Event
+from events.rsvp import bulk_rsvp, resolve_user_ids
+
+
+class Command(BaseCommand):
+    help = 'Register many users for an event at once, by username/email, group or a file of either.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int)
+        parser.add_argument('users', nargs='*', help='Usernames or emails.')
+        parser.add_argument('--group', action='append', default=[],
+                            help='Register every member of this group (repeatable).')
+        parser.add_argument('--file', help='File with one username or email per line.')
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError(f'Event {options["event_id"]} does not exist.')
+
+        identifiers = list(options['users'])
+        if options['file']:
+            with open(options['file']) as f:
+                identifiers.extend(line.strip() for line in f if line.strip())
+        groups = list(Group.objects.filter(name__in=options['group']))
+        missing = set(options['group']) - {group.name for group in groups}
+        if missing:
+            raise CommandError(f'Unknown group(s): {", ".join(sorted(missing))}')
+
+        user_ids = resolve_user_ids(identifiers, groups)
+        added = bulk_rsvp(event, user_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Registered {added} new participant(s) for {event.name} ({len(user_ids)} matched).'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.archive import archive_events, cutoff_date
+
+
+class Command(BaseCommand):
+    help = 'Move past events and their participants to the archive (run daily, e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help='Archive events more than this many days old (default: ARCHIVE_AFTER_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Events moved per transaction (default: 500).')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days cannot be negative.')
+        cutoff = cutoff_date(options['days'])
+        archived = archive_events(cutoff, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} event(s) dated before {cutoff}.'))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from events import benchmark
+
+
+class Command(BaseCommand):
+    help = ('Run the request scenarios, report throughput, latency percentiles and query counts, '
+            'and fail on regressions against a stored baseline.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*',
+                            help='Only run scenarios whose name starts with one of these.')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--base-url',
+                            help='Send anonymous GET scenarios to a running server (e.g. gunicorn) '
+                                 'instead of the test client.')
+        parser.add_argument('--asgi', action='store_true',
+                            help='Send requests through the ASGI handler; with ASYNC_VIEWS=True this '
+                                 'measures the async views.')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Requests in flight at once (default: 1).')
+        parser.add_argument('--baseline', help='JSON results to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95/throughput regression as a fraction (default: 0.2).')
+        parser.add_argument('--save', help='Write these results as JSON, e.g. to use as a baseline.')
+
+    def handle(self, *args, **options):
+        # Test client requests need 'testserver' allowed and the locmem mail backend.
+        setup_test_environment()
+        try:
+            results = benchmark.run(
+                iterations=options['iterations'], warmup=options['warmup'],
+                only=options['scenarios'], base_url=options['base_url'],
+                asgi=options['asgi'], concurrency=options['concurrency'],
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+        finally:
+            teardown_test_environment()
+
+        self.stdout.write(f'{"scenario":<32} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8}')
+        for name, row in results.items():
+            queries = '-' if row['queries'] is None else row['queries']
+            self.stdout.write(
+                f'{name:<32} {row["rps"]:>8.1f} {row["p50"]:>8.1f} {row["p95"]:>8.1f} {row["p99"]:>8.1f} {queries:>8}'
+            )
+
+        if options['save']:
+            benchmark.save(results, options['save'])
+            self.stdout.write(f'Saved results to {options["save"]}.')
+        if options['baseline']:
+            regressions = benchmark.compare(results, benchmark.load(options['baseline']), options['tolerance'])
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from events.models import Category, Event
+
+User = get_user_model()
+
+# Lookup tables that stay small enough for a full scan to be the right plan.
+DEFAULT_IGNORED_TABLES = ['auth_group', 'django_content_type', 'events_category']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every events view inside a rolled back transaction, EXPLAIN each SELECT '
+        'it runs and flag full table scans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ignore', action='append', default=None, metavar='TABLE',
+            help='Table allowed to be fully scanned (repeatable). '
+                 f'Defaults to {", ".join(DEFAULT_IGNORED_TABLES)}.',
+        )
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Exit with an error if any full scan is found (for CI).',
+        )
+
+    def handle(self, *args, **options):
+        ignored = set(options['ignore'] or DEFAULT_IGNORED_TABLES)
+        self.flagged = []
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+                for label, url, role in self.scenarios():
+                    self.explain_view(label, url, role, ignored)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if self.flagged:
+            self.stdout.write(self.style.WARNING(f'\n{len(self.flagged)} full scan(s) found:'))
+            for label, line in self.flagged:
+                self.stdout.write(f'  {label}: {line}')
+            if options['fail_on_scan']:
+                raise CommandError('Full table scans found.')
+        else:
+            self.stdout.write(self.style.SUCCESS('\nNo full table scans found.'))
+
+    def scenarios(self):
+        category = Category.objects.create(name='Explain', description='Explain')
+        event = Event.objects.create(
+            name='Explain', description='Explain', date='2030-01-01', time='10:00',
+            location='Explain', category=category,
+        )
+        users = {}
+        for role in ['Admin', 'Organizer', 'Participant']:
+            group, _ = Group.objects.get_or_create(name=role)
+            user = User.objects.create_user(username=f'__explain_{role.lower()}')
+            user.groups.add(group)
+            users[role] = user
+        self.users = users
+
+        event_list = reverse('event_list')
+        return [
+            ('event_list', event_list, None),
+            ('event_list?category', f'{event_list}?category={category.pk}', None),
+            ('event_list?date_range', f'{event_list}?start_date=2030-01-01&end_date=2030-12-31', None),
+            ('event_list?search', f'{event_list}?search=explain', None),
+            ('event_detail', reverse('event_detail', args=[event.pk]), 'Participant'),
+            ('dashboard[Admin]', reverse('dashboard'), 'Admin'),
+            ('dashboard[Organizer]', reverse('dashboard'), 'Organizer'),
+            ('dashboard[Participant]', reverse('dashboard'), 'Participant'),
+            ('category_list', reverse('category_list'), 'Organizer'),
+        ]
+
+    def explain_view(self, label, url, role, ignored):
+        client = Client()
+        if role:
+            client.force_login(self.users[role])
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{label}  GET {url}  -> {response.status_code}'))
+
+        seen = set()
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT') or sql in seen:
+                continue
+            seen.add(sql)
+            self.stdout.write(f'  {sql[:160]}')
+            for line in self.explain(sql):
+                scan = self.full_scan_table(line)
+                if scan and scan not in ignored:
+                    self.flagged.append((label, line))
+                    self.stdout.write(self.style.ERROR(f'    ! {line}'))
+                else:
+                    self.stdout.write(f'      {line}')
+
+    def explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+    def full_scan_table(self, line):
+        detail = line.strip().lstrip('->').strip()
+        if connection.vendor == 'sqlite':
+            # "SCAN events_event" is a full scan; "SCAN t USING INDEX ..." and
+            # "SCAN t VIRTUAL TABLE INDEX ..." walk an index.
+            parts = detail.split()
+            if len(parts) >= 2 and parts[0] == 'SCAN' and 'USING' not in parts and 'VIRTUAL' not in parts:
+                return parts[1]
+            return None
+        # "Seq Scan on t", or "Parallel Seq Scan on t" in parallel plans.
+        node, on, rest = detail.partition(' on ')
+        if on and node.endswith('Seq Scan'):
+            return rest.split()[0]
+        return None
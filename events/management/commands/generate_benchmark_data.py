@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from events import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate users, categories, events and RSVPs for `manage.py benchmark`.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--events', type=int, default=50_000)
+        parser.add_argument('--categories', type=int, default=200)
+        parser.add_argument('--rsvps', type=int, default=2_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per INSERT (default: 5000).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously generated data first.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            benchmark.clear()
+            self.stdout.write('Cleared previous benchmark data.')
+        benchmark.generate(
+            users=options['users'], events=options['events'], categories=options['categories'],
+            rsvps=options['rsvps'], batch_size=options['batch_size'], seed=options['seed'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. Role users {", ".join(benchmark.ROLE_USERS.values())} have password "{benchmark.PASSWORD}".'
+        ))
@@ -0,0 +1,51 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.importer import COLUMNS, READERS, import_events
+
+
+class Command(BaseCommand):
+    help = (f'Import events from a CSV file (columns: {", ".join(COLUMNS)}) or an iCalendar feed, '
+            'updating events whose external_id (iCalendar UID) already exists.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for standard input.')
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='Input format (default: from the file extension).')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows written per INSERT and per transaction (default: 1000).')
+        parser.add_argument('--create-categories', action='store_true',
+                            help='Create categories that do not exist yet instead of rejecting their rows.')
+        parser.add_argument('--default-category',
+                            help='Category for rows that do not name one.')
+        parser.add_argument('--max-errors', type=int, default=20,
+                            help='Invalid rows to print before only counting them (default: 20).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in READERS:
+            raise CommandError('Cannot tell the format from the file name; pass --format csv or --format ics.')
+
+        printed = 0
+
+        def report(error):
+            nonlocal printed
+            if printed < options['max_errors']:
+                self.stderr.write(f'Skipped {error}')
+                printed += 1
+
+        try:
+            f = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        except OSError as exc:
+            raise CommandError(exc)
+        with f:
+            created, updated, skipped = import_events(
+                f, fmt, batch_size=options['batch_size'], create_categories=options['create_categories'],
+                default_category=options['default_category'], on_error=report,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created + updated} event(s): {created} created, {updated} updated, {skipped} skipped.'
+        ))
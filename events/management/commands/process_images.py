@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.images import image_fields, process_pending
+from events.models import CustomUser, Event
+
+
+class Command(BaseCommand):
+    help = 'Strip metadata from uploaded images, cap their size and write their WebP/JPEG variants.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Backfill: reprocess every image, not only ones without variants.')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Rows loaded per query (default: 100).')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new uploads instead of exiting once done.')
+        parser.add_argument('--interval', type=float, default=10.0,
+                            help='Seconds to sleep between polls with --loop (default: 10).')
+
+    def handle(self, *args, **options):
+        everything = options['all']
+        while True:
+            # Shared across models so the default images are processed once per run.
+            memo = {}
+            total = 0
+            for model in (Event, CustomUser):
+                for field_name in image_fields(model):
+                    processed, done = process_pending(
+                        model, field_name, options['batch_size'], everything=everything, memo=memo
+                    )
+                    total += processed
+                    if processed:
+                        self.stdout.write(self.style.SUCCESS(
+                            f'{model._meta.label}.{field_name}: {processed} processed, {done} with variants.'
+                        ))
+            everything = False
+            if not options['loop']:
+                break
+            if not total:
+                time.sleep(options['interval'])
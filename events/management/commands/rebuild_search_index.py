@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the event full-text search index from the events table.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
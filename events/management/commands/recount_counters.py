@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.counters import COUNTERS, recount
+
+
+class Command(BaseCommand):
+    help = 'Recount the cached dashboard totals from the database (run periodically to heal drift).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('counters', nargs='*', metavar='COUNTER',
+                            help=f'Counters to recount: {", ".join(COUNTERS)}. Defaults to all.')
+
+    def handle(self, *args, **options):
+        unknown = set(options['counters']) - set(COUNTERS)
+        if unknown:
+            raise CommandError(f'Unknown counter(s): {", ".join(sorted(unknown))}')
+        for name, total in recount(*options['counters']).items():
+            self.stdout.write(f'{name}: {total}')
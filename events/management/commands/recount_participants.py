@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from events import pagecache
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Recompute Event.participant_count from the participants table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Events updated per transaction (default: 5000).')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = Event.objects.aggregate(last=Max('id'))['last'] or 0
+        updated = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                batch = Event.objects.filter(id__gt=start, id__lte=start + batch_size)
+                ids = list(batch.stale_participant_counts().values_list('pk', flat=True))
+                if not ids:
+                    continue
+                updated += Event.objects.filter(pk__in=ids).recount_participants()
+                # Queryset updates send no signals; drop the cached pages showing the old counts.
+                scopes = [pagecache.LIST_SCOPE, *map(pagecache.event_scope, ids)]
+                transaction.on_commit(lambda scopes=scopes: pagecache.bump(*scopes))
+        self.stdout.write(self.style.SUCCESS(f'Corrected participant counts for {updated} events.'))
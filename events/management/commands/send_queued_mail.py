@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from events.outbox import purge_sent, send_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound email in batches, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Messages sent per connection (default: EMAIL_QUEUE_BATCH_SIZE).')
+        parser.add_argument('--max-attempts', type=int, default=None,
+                            help='Attempts before a message is marked failed (default: EMAIL_QUEUE_MAX_ATTEMPTS).')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the queue instead of exiting once it is drained.')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep between polls with --loop (default: 5).')
+        parser.add_argument('--purge-days', type=int, default=None,
+                            help='Delete sent messages older than this many days before sending.')
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            purged = purge_sent(timedelta(days=options['purge_days']))
+            self.stdout.write(f'Purged {purged} sent message(s).')
+
+        while True:
+            try:
+                sent, failed = send_pending(options['batch_size'], options['max_attempts'])
+            except Exception as exc:
+                # Mail backend unreachable: the claimed batch is retried once its claim expires.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Mail backend error: {exc!r}')
+                time.sleep(options['interval'])
+                continue
+
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from events import viewstats
+
+
+class Command(BaseCommand):
+    help = 'Show p50/p95/p99 query count and timings per view, as recorded by ViewTimingMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help='URL names to show (default: all with samples).')
+        parser.add_argument('--reset', action='store_true', help='Clear the recorded samples.')
+
+    def handle(self, *args, **options):
+        names = options['views'] or None
+        if options['reset']:
+            viewstats.reset(names)
+            self.stdout.write(self.style.SUCCESS('View stats cleared.'))
+            return
+
+        stats = viewstats.summary(names)
+        if not stats:
+            self.stdout.write('No samples recorded. Is VIEW_TIMING_ENABLED set?')
+            return
+
+        self.stdout.write(
+            f'{"view":<28} {"samples":>8}  {"queries p50/p95/p99":>20}  {"db ms":>20}  '
+            f'{"render ms":>20}  {"total ms":>20}  {"connects":>20}'
+        )
+        for name, row in sorted(stats.items(), key=lambda item: -item[1]['samples']):
+            columns = '  '.join(
+                f'{"/".join(f"{value:.0f}" for value in row[metric]):>20}' for metric in viewstats.METRICS
+            )
+            self.stdout.write(f'{name:<28} {row["samples"]:>8}  {columns}')
+        self.stdout.write('Percentiles are histogram bucket upper bounds (within 25%).')
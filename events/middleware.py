@@ -0,0 +1,190 @@
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import routers, viewstats
+
+
+class QueryTimer:
+    """``execute_wrapper`` that counts queries and adds up the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def pool_timings():
+    """Server-Timing entries with the state of each psycopg connection pool in this process."""
+    entries = []
+    for alias in connections:
+        if not connections.settings[alias].get('OPTIONS', {}).get('pool'):
+            continue
+        stats = connections[alias].pool.get_stats()
+        entries.append(
+            f'pool-{alias};desc="{stats.get("pool_size", 0)} open, {stats.get("pool_available", 0)} idle, '
+            f'{stats.get("requests_waiting", 0)} waiting"'
+        )
+    return entries
+
+
+class ViewTimingMiddleware:
+    """
+    Measure query count, DB time, new DB connections, template render time and
+    total time per request. Render time covers TemplateResponses, whether the
+    handler renders them or the page cache does (see ``pagecache.render()``).
+
+    Adds a ``Server-Timing`` header when VIEW_TIMING_HEADER is set and records a
+    VIEW_TIMING_SAMPLE_RATE fraction of requests into the shared histograms read
+    by ``manage.py view_stats``. Disabled entirely unless VIEW_TIMING_ENABLED.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'VIEW_TIMING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'VIEW_TIMING_SAMPLE_RATE', 1.0)
+        self.header = getattr(settings, 'VIEW_TIMING_HEADER', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        request.view_render_time = 0.0
+        start = time.perf_counter()
+        before, stack = self.watch_connections(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            connects = self.unwatch_connections(before, stack)
+        return self.finish(request, response, timer, start, connects)
+
+    async def __acall__(self, request):
+        # Database connections belong to the thread the async ORM runs queries in,
+        # so the wrappers are installed and removed there.
+        timer = QueryTimer()
+        request.view_render_time = 0.0
+        start = time.perf_counter()
+        before, stack = await sync_to_async(self.watch_connections)(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            connects = await sync_to_async(self.unwatch_connections)(before, stack)
+        return self.finish(request, response, timer, start, connects)
+
+    def watch_connections(self, timer):
+        # Open DB-API connections before the view, to spot ones it had to (re)open.
+        before = {alias: connections[alias].connection for alias in connections}
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timer))
+        return before, stack
+
+    def unwatch_connections(self, before, stack):
+        stack.close()
+        return sum(
+            1 for alias, previous in before.items()
+            if connections[alias].connection is not None and connections[alias].connection is not previous
+        )
+
+    def finish(self, request, response, timer, start, connects):
+        total = time.perf_counter() - start
+        values = {
+            'queries': timer.count,
+            'db': timer.duration * 1000,
+            'render': request.view_render_time * 1000,
+            'total': total * 1000,
+            'connects': connects,
+        }
+        if self.header:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={values["db"]:.1f};desc="{timer.count} queries, {values["connects"]} connects"',
+                *pool_timings(),
+                f'render;dur={values["render"]:.1f}',
+                f'total;dur={values["total"]:.1f}',
+            ])
+        if random.random() < self.sample_rate:
+            match = request.resolver_match
+            viewstats.record(match.view_name if match else '<unresolved>', values)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before a TemplateResponse is rendered.
+        started = time.perf_counter()
+
+        def rendered(response):
+            request.view_render_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let GET/HEAD requests to the event read views (``routers.read_views()``) read
+    from DATABASE_REPLICAS, except for a client that wrote recently. A successful
+    write (any other method) sets a short-lived cookie that pins the client to the
+    primary for READ_YOUR_WRITES_SECONDS, so it sees its own RSVP or edit despite
+    replication lag. Disabled when no replicas are set.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not routers.replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.replica_reads = routers.ReplicaReads()
+        with routers.use_replicas(request.replica_reads):
+            response = self.get_response(request)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        # Context variables are copied into the threads the async ORM runs in.
+        request.replica_reads = routers.ReplicaReads()
+        with routers.use_replicas(request.replica_reads):
+            response = await self.get_response(request)
+        return self.pin(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Covers the view and its template rendering; earlier middleware read the primary.
+        request.replica_reads.enabled = self.may_use_replicas(request)
+
+    def may_use_replicas(self, request):
+        return (
+            request.method in self.SAFE_METHODS
+            and routers.PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.url_name in routers.read_views()
+        )
+
+    def pin(self, request, response):
+        if request.method not in self.SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                routers.PIN_COOKIE, '1', max_age=routers.pin_seconds(), httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# The full-text index as first created (see events/search.py for the live code).
+# Kept inline so replaying this migration doesn't depend on today's search module.
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_event_fts "
+    "USING fts5(name, location, description, category, tokenize='unicode61 remove_diacritics 2')"
+)
+SQLITE_BACKFILL = (
+    "INSERT INTO events_event_fts (rowid, name, location, description, category) "
+    "SELECT e.id, e.name, e.location, e.description, c.name "
+    "FROM events_event e INNER JOIN events_category c ON c.id = e.category_id"
+)
+SQLITE_DROP = "DROP TABLE IF EXISTS events_event_fts"
+
+POSTGRES_CREATE = [
+    "CREATE TABLE IF NOT EXISTS events_eventsearch ("
+    "event_id bigint PRIMARY KEY REFERENCES events_event (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS events_eventsearch_document_gin ON events_eventsearch USING GIN (document)",
+]
+POSTGRES_BACKFILL = (
+    "INSERT INTO events_eventsearch (event_id, document) "
+    "SELECT e.id, "
+    "setweight(to_tsvector('english', e.name), 'A') || "
+    "setweight(to_tsvector('english', e.location), 'B') || "
+    "setweight(to_tsvector('english', c.name), 'B') || "
+    "setweight(to_tsvector('english', e.description), 'C') "
+    "FROM events_event e INNER JOIN events_category c ON c.id = e.category_id "
+    "ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document"
+)
+POSTGRES_DROP = "DROP TABLE IF EXISTS events_eventsearch"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(SQLITE_CREATE)
+            cursor.execute(SQLITE_BACKFILL)
+        elif vendor == "postgresql":
+            for statement in POSTGRES_CREATE:
+                cursor.execute(statement)
+            cursor.execute(POSTGRES_BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(SQLITE_DROP)
+        elif vendor == "postgresql":
+            cursor.execute(POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["date", "time", "id"], name="event_date_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["category", "date"], name="event_category_date_idx"
+            ),
+        ),
+        # The auto-created participants table only has (event_id, customuser_id)
+        # unique plus single-column FK indexes; cover the reverse user -> events
+        # lookup (dashboards, rsvp_events) so it is an index-only scan.
+        migrations.RunSQL(
+            sql="CREATE INDEX event_participants_user_idx "
+            "ON events_event_participants (customuser_id, event_id)",
+            reverse_sql="DROP INDEX event_participants_user_idx",
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="participant_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE events_event SET participant_count = ("
+            "SELECT COUNT(*) FROM events_event_participants p "
+            "WHERE p.event_id = events_event.id)",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["-participant_count", "id"], name="event_popularity_idx"
+            ),
+        ),
+    ]
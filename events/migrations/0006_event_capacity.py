@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0005_outboundemail"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="capacity",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Leave empty for unlimited.", null=True
+            ),
+        ),
+    ]
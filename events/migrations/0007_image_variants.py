@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_event_capacity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="profile_picture_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="event_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
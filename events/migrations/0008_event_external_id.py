@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="external_id",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
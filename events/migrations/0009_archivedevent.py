@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0008_event_external_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedEvent",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=200)),
+                ("description", models.TextField()),
+                ("date", models.DateField()),
+                ("time", models.TimeField()),
+                ("location", models.CharField(max_length=200)),
+                (
+                    "event_image",
+                    models.ImageField(
+                        default="event_images/default.jpg", upload_to="event_images/"
+                    ),
+                ),
+                (
+                    "event_image_variants",
+                    models.JSONField(blank=True, default=dict, editable=False),
+                ),
+                (
+                    "participant_count",
+                    models.PositiveIntegerField(default=0, editable=False),
+                ),
+                ("capacity", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "external_id",
+                    models.CharField(
+                        blank=True, max_length=255, null=True, unique=True
+                    ),
+                ),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_events",
+                        to="events.category",
+                    ),
+                ),
+                (
+                    "participants",
+                    models.ManyToManyField(
+                        blank=True,
+                        related_name="archived_rsvp_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:40
+
+import secrets
+
+import events.models
+from django.db import migrations, models
+
+
+def create_tokens(apps, schema_editor):
+    CustomUser = apps.get_model("events", "CustomUser")
+    for user in CustomUser.objects.filter(calendar_token__isnull=True).only("pk").iterator():
+        CustomUser.objects.filter(pk=user.pk).update(calendar_token=secrets.token_urlsafe(32))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0009_archivedevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="calendar_token",
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(create_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="customuser",
+            name="calendar_token",
+            field=models.CharField(
+                default=events.models.new_calendar_token,
+                editable=False,
+                max_length=64,
+                unique=True,
+            ),
+        ),
+    ]
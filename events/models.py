@@ -1,10 +1,22 @@
+import secrets
+
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 
+def new_calendar_token():
+    return secrets.token_urlsafe(32)
+
 class CustomUser(AbstractUser):
     profile_picture = models.ImageField(upload_to='profile_pics/', default='profile_pics/default.jpg')
+    # Resized WebP/JPEG copies written by events.images; empty until processed
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     phone_number = models.CharField(max_length=15, blank=True) # Basic validation can be added in forms
+    # Secret in the user's calendar feed URL (see events/feeds.py); replaced on password change
+    calendar_token = models.CharField(max_length=64, unique=True, default=new_calendar_token, editable=False)
 
     def __str__(self):
         return self.username
@@ -16,6 +28,21 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class EventQuerySet(models.QuerySet):
+    @staticmethod
+    def _participant_total():
+        through = Event.participants.through
+        count = (through.objects.filter(event_id=OuterRef('pk'))
+                 .values('event_id').annotate(total=Count('*')).values('total'))
+        return Coalesce(Subquery(count), 0)
+
+    def recount_participants(self):
+        return self.update(participant_count=self._participant_total())
+
+    def stale_participant_counts(self):
+        """The events whose participant_count doesn't match their participants."""
+        return self.alias(actual=self._participant_total()).exclude(participant_count=F('actual'))
+
 class Event(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
@@ -25,6 +52,110 @@ class Event(models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='events')
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='rsvp_events', blank=True)
     event_image = models.ImageField(upload_to='event_images/', default='event_images/default.jpg')
+    event_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Denormalized len(participants), maintained with F() updates by the m2m_changed handler
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    capacity = models.PositiveIntegerField(null=True, blank=True, help_text='Leave empty for unlimited.')
+    # Partner catalog id (CSV external_id or iCalendar UID); `import_events` upserts on it
+    external_id = models.CharField(max_length=255, null=True, blank=True, unique=True)
+
+    objects = EventQuerySet.as_manager()
+
+    is_archived = False
+
+    # Fields shown in a user's calendar feed (events/feeds.py), besides the id
+    FEED_FIELDS = ('name', 'description', 'date', 'time', 'location')
+
+    class Meta:
+        indexes = [
+            # Event list / dashboards: ORDER BY date, time, id and date range filters
+            models.Index(fields=['date', 'time', 'id'], name='event_date_time_idx'),
+            # Category filter combined with date ordering
+            models.Index(fields=['category', 'date'], name='event_category_date_idx'),
+            # "Most popular" sort
+            models.Index(fields=['-participant_count', 'id'], name='event_popularity_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets a save that moves the event refresh its old category's calendar feed,
+        # and one that changes nothing shown in feeds skip its participants' feeds.
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        instance._loaded_feed_values = instance.feed_values()
+        return instance
+
+    def feed_values(self):
+        # Deferred fields are left out rather than loaded.
+        return {name: self.__dict__.get(name) for name in self.FEED_FIELDS}
+
+    @property
+    def is_full(self):
+        return self.capacity is not None and self.participant_count >= self.capacity
+
+    def save(self, *args, **kwargs):
+        # Never write back a stale in-memory participant_count over the F() updates.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'participant_count'
+            ]
+        super().save(*args, **kwargs)
+
+class ArchivedEvent(models.Model):
+    """
+    A past event moved out of the Event table by `manage.py archive_events`, with its
+    participants. It keeps the event's id, so EventDetailView still finds it.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=200)
+    description = models.TextField()
+    date = models.DateField()
+    time = models.TimeField()
+    location = models.CharField(max_length=200)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='archived_events')
+    participants = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='archived_rsvp_events', blank=True)
+    event_image = models.ImageField(upload_to='event_images/', default='event_images/default.jpg')
+    event_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    external_id = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    def __str__(self):
+        return self.name
+
+class OutboundEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker only ever looks for due, pending mail
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status='pending'), name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
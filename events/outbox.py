@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def default_from_email():
+    return settings.EMAIL_HOST_USER if hasattr(settings, 'EMAIL_HOST_USER') else 'noreply@example.com'
+
+
+def enqueue(subject, body, recipient_list, from_email=None):
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email if from_email is not None else default_from_email(),
+        to=list(recipient_list),
+    )
+
+
+def enqueue_many(messages):
+    """Queue several ``(subject, body, recipient_list)`` tuples with one INSERT."""
+    from_email = default_from_email()
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(subject=subject, body=body, from_email=from_email, to=list(recipient_list))
+        for subject, body, recipient_list in messages
+    ])
+
+
+def retry_delay(attempts):
+    # Exponential backoff: base, 2 * base, 4 * base, ... capped at one day.
+    base = getattr(settings, 'EMAIL_QUEUE_RETRY_DELAY', 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 86400))
+
+
+def claim_timeout():
+    return timedelta(seconds=getattr(settings, 'EMAIL_QUEUE_CLAIM_TIMEOUT', 300))
+
+
+def claim_due(batch_size):
+    """
+    Claim a batch of due mail in a short transaction by moving its next attempt
+    past the claim timeout, so other workers skip it while it is being sent and a
+    worker that dies mid-batch leaves it to be retried.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        due = OutboundEmail.objects.filter(
+            status=OutboundEmail.PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + claim_timeout()
+            )
+    return batch
+
+
+def send_pending(batch_size=None, max_attempts=None):
+    """
+    Send one batch of due mail over a single backend connection.
+
+    The batch is claimed first (see ``claim_due()``), so sending holds no
+    transaction or row locks and several workers can drain the queue side by
+    side. Each result is recorded with its own UPDATE. Returns ``(sent, failed)``.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE', 100)
+    max_attempts = max_attempts or getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+    sent = failed = 0
+
+    batch = claim_due(batch_size)
+    if not batch:
+        return sent, failed
+
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+        for email in batch:
+            message = EmailMessage(email.subject, email.body, email.from_email, email.to,
+                                   connection=mail_connection)
+            attempts = email.attempts + 1
+            try:
+                mail_connection.send_messages([message])
+            except Exception as exc:
+                failed += 1
+                result = {'last_error': repr(exc)}
+                if attempts >= max_attempts:
+                    result['status'] = OutboundEmail.FAILED
+                else:
+                    result['next_attempt_at'] = timezone.now() + retry_delay(attempts)
+            else:
+                sent += 1
+                result = {'status': OutboundEmail.SENT, 'sent_at': timezone.now(), 'last_error': ''}
+            OutboundEmail.objects.filter(pk=email.pk).update(attempts=attempts, **result)
+    finally:
+        mail_connection.close()
+    return sent, failed
+
+
+def purge_sent(older_than):
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.SENT, sent_at__lt=timezone.now() - older_than
+    ).delete()[0]
@@ -0,0 +1,182 @@
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import routers
+
+VERSION_KEY = 'events:pagecache:version:{}'
+PAGE_KEY = 'events:pagecache:page:{}'
+
+# Version scopes: every list page, one per event detail page, and one per
+# calendar feed (a user's RSVPs, a category's events; see events/feeds.py).
+LIST_SCOPE = 'list'
+
+
+def event_scope(pk):
+    return f'event:{pk}'
+
+
+def user_scope(pk):
+    return f'user:{pk}'
+
+
+def category_scope(pk):
+    return f'category:{pk}'
+
+
+def cache_alias():
+    return getattr(settings, 'EVENTS_PAGE_CACHE', 'default')
+
+
+def get_cache():
+    return caches[cache_alias()]
+
+
+def timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+
+
+def get_versions(*scopes):
+    """
+    Current version of each scope: the time it last changed.
+
+    Cached pages and fragments embed these in their keys, so bumping a version
+    orphans every entry built from the old one without scanning for keys. Versions
+    expire with the pages, so a worker whose cache missed a bump (a per-process
+    cache, see checks.py) serves stale pages for at most PAGE_CACHE_TIMEOUT.
+    """
+    cache = get_cache()
+    keys = {scope: VERSION_KEY.format(scope) for scope in scopes}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for scope, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            # Unknown (or evicted): start a fresh version rather than trust old entries.
+            version = time.time()
+            cache.add(key, version, timeout())
+            version = cache.get(key, version)
+        versions[scope] = version
+    return versions
+
+
+async def aget_versions(*scopes):
+    cache = get_cache()
+    keys = {scope: VERSION_KEY.format(scope) for scope in scopes}
+    found = await cache.aget_many(keys.values())
+    versions = {}
+    for scope, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = time.time()
+            await cache.aadd(key, version, timeout())
+            version = await cache.aget(key, version)
+        versions[scope] = version
+    return versions
+
+
+def bump(*scopes):
+    if scopes:
+        now = time.time()
+        get_cache().set_many({VERSION_KEY.format(scope): now for scope in scopes}, timeout())
+
+
+def normalize_params(query_dict, names):
+    """Filter parameters in a fixed order with empty values dropped, so equivalent URLs share a key."""
+    return tuple((name, query_dict.get(name)) for name in names if query_dict.get(name))
+
+
+def make_key(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+async def ahas_fragment(fragment_name, vary_on):
+    return await get_cache().ahas_key(make_template_fragment_key(fragment_name, [vary_on]))
+
+
+def render(request, response):
+    """
+    Render ``response`` now, to cache its content. The handler won't render it again,
+    so the time is added to ViewTimingMiddleware's render metric here.
+    """
+    started = time.perf_counter()
+    response.render()
+    if hasattr(request, 'view_render_time'):
+        request.view_render_time += time.perf_counter() - started
+
+
+def replica_guard(versions):
+    """
+    Read from the primary while any scope changed within READ_YOUR_WRITES_SECONDS,
+    so a lagging replica's rows are never cached under the new version.
+    """
+    if routers.replica_aliases() and time.time() - max(versions.values()) < routers.pin_seconds():
+        return routers.use_replicas(False)
+    return nullcontext()
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve GETs from anonymous visitors from a rendered page cache, with ETag and
+    Last-Modified derived from the page's version scopes so repeat visits can get
+    a 304 without touching the database or the template engine.
+
+    Views provide ``page_cache_scopes()`` and ``page_cache_params()``. Templates get
+    ``page_cache_alias`` and ``page_cache_timeout`` for their ``{% cache %}`` fragments.
+    """
+
+    def page_cache_scopes(self):
+        return [LIST_SCOPE]
+
+    def page_cache_params(self):
+        return ()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_cache_alias'] = cache_alias()
+        context['page_cache_timeout'] = timeout()
+        return context
+
+    def get(self, request, *args, **kwargs):
+        versions = get_versions(*self.page_cache_scopes())
+        with replica_guard(versions):
+            return self.get_cached(request, versions, *args, **kwargs)
+
+    def get_cached(self, request, versions, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        key, etag, last_modified = self.page_validators(request, versions)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            cache = get_cache()
+            cached = cache.get(PAGE_KEY.format(key))
+            if cached is None:
+                response = super().get(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    render(request, response)
+                if response.status_code == 200:
+                    cache.set(PAGE_KEY.format(key), (response.content, response['Content-Type']), timeout())
+            else:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+        return self.set_validators(response, etag, last_modified)
+
+    def page_validators(self, request, versions):
+        """``(cache key, ETag, Last-Modified timestamp)`` for this page at ``versions``."""
+        key = make_key(request.path, sorted(versions.items()), self.page_cache_params())
+        return key, f'"{key}"', int(max(versions.values()))
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Revalidate every time; the 304 path is cheap.
+        response['Cache-Control'] = 'no-cache'
+        return response
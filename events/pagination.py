@@ -0,0 +1,156 @@
+import base64
+import binascii
+from datetime import date, time
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Keyset ordering used by the event list: date, then time, then id as a tie-breaker.
+EVENT_ORDERING = ('date', 'time', 'id')
+
+# How each key is read back out of a cursor.
+KEY_PARSERS = {
+    'date': date.fromisoformat,
+    'time': time.fromisoformat,
+    'id': int,
+    'search_rank': float,
+    'participant_count': int,
+}
+
+
+def _encode_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return repr(value)
+
+
+def encode_cursor(obj, ordering=EVENT_ORDERING):
+    raw = '|'.join(_encode_value(getattr(obj, key.lstrip('-'))) for key in ordering)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering=EVENT_ORDERING):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        if len(values) != len(ordering):
+            raise ValueError(cursor)
+        return [KEY_PARSERS[key.lstrip('-')](value) for key, value in zip(ordering, values)]
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise Http404('Invalid page cursor.')
+
+
+def keyset_filter(ordering, values, reverse=False):
+    # (a, b, c) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+    condition = Q()
+    equal = {}
+    for key, value in zip(ordering, values):
+        field = key.lstrip('-')
+        ascending = not key.startswith('-')
+        lookup = 'gt' if ascending != reverse else 'lt'
+        condition |= Q(**equal, **{f'{field}__{lookup}': value})
+        equal[field] = value
+    return condition
+
+
+def reverse_ordering(ordering):
+    return tuple(key[1:] if key.startswith('-') else f'-{key}' for key in ordering)
+
+
+def get_page_size(value, default=None, maximum=None):
+    default = default or getattr(settings, 'EVENTS_PAGE_SIZE', 25)
+    maximum = maximum or getattr(settings, 'EVENTS_MAX_PAGE_SIZE', 100)
+    try:
+        size = int(value) if value else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+class KeysetPage:
+    """
+    A page of rows, fetched on first use so an unused page (e.g. in a cached
+    fragment) costs nothing. Async views load it up front with ``await page.aload()``.
+    """
+
+    def __init__(self, queryset, finish, ordering=EVENT_ORDERING):
+        # ``finish`` turns the fetched rows into (rows, has_next, has_previous).
+        self._queryset = queryset
+        self._finish = finish
+        self.ordering = ordering
+
+    @cached_property
+    def _result(self):
+        return self._finish(list(self._queryset))
+
+    async def aload(self):
+        if '_result' not in self.__dict__:
+            self.__dict__['_result'] = self._finish([row async for row in self._queryset])
+        return self
+
+    @property
+    def object_list(self):
+        return self._result[0]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._result[1]
+
+    def has_previous(self):
+        return self._result[2]
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next() and self.object_list:
+            return encode_cursor(self.object_list[-1], self.ordering)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous() and self.object_list:
+            return encode_cursor(self.object_list[0], self.ordering)
+        return None
+
+
+class KeysetPaginator:
+    """
+    Paginates on a unique ordering (by default date, time, id) so every page is a
+    bounded index range scan, however deep it is, instead of an OFFSET that grows
+    with the page number.
+    """
+
+    def __init__(self, queryset, per_page, ordering=EVENT_ORDERING):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+
+    def page(self, after=None, before=None):
+        per_page = self.per_page
+        if before:
+            values = decode_cursor(before, self.ordering)
+            queryset = self.queryset.filter(
+                keyset_filter(self.ordering, values, reverse=True)
+            ).order_by(*reverse_ordering(self.ordering))
+
+            def finish(rows):
+                return rows[:per_page][::-1], True, len(rows) > per_page
+            return KeysetPage(queryset[:per_page + 1], finish, self.ordering)
+
+        queryset = self.queryset.order_by(*self.ordering)
+        if after:
+            values = decode_cursor(after, self.ordering)
+            queryset = queryset.filter(keyset_filter(self.ordering, values))
+
+        def finish(rows):
+            return rows[:per_page], len(rows) > per_page, bool(after)
+        return KeysetPage(queryset[:per_page + 1], finish, self.ordering)
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.cache import cache
+
+ROLE_CACHE_KEY = 'events:roles:{}'
+
+
+def _cache_key(user_id):
+    return ROLE_CACHE_KEY.format(user_id)
+
+
+def _shared():
+    # A per-process cache can't be invalidated in the other workers, which would
+    # keep honouring a revoked role until the entry expired.
+    return getattr(settings, 'SHARED_CACHE', False)
+
+
+def get_user_roles(user):
+    """
+    Return the set of group names for ``user``.
+
+    Memoized on the user object for the rest of the request and, with a
+    SHARED_CACHE, cached across requests by user id; the cache is cleared by the
+    group signals in signals.py.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_cached_roles', None)
+    if roles is None:
+        key = _cache_key(user.pk)
+        roles = cache.get(key) if _shared() else None
+        if roles is None:
+            roles = frozenset(user.groups.values_list('name', flat=True))
+            if _shared():
+                cache.set(key, roles, getattr(settings, 'ROLE_CACHE_TIMEOUT', 300))
+        user._cached_roles = roles
+    return roles
+
+
+async def aget_user_roles(user):
+    """``get_user_roles()`` for async views, sharing the same memo and cache."""
+    if not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_cached_roles', None)
+    if roles is None:
+        key = _cache_key(user.pk)
+        roles = await cache.aget(key) if _shared() else None
+        if roles is None:
+            roles = frozenset([name async for name in user.groups.values_list('name', flat=True)])
+            if _shared():
+                await cache.aset(key, roles, getattr(settings, 'ROLE_CACHE_TIMEOUT', 300))
+        user._cached_roles = roles
+    return roles
+
+
+def has_role(user, *roles):
+    return not get_user_roles(user).isdisjoint(roles)
+
+
+def invalidate_user_roles(*user_ids):
+    if _shared():
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
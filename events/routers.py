@@ -0,0 +1,82 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set by ReplicaRoutingMiddleware for the duration of a request that may read from a replica.
+_use_replicas = ContextVar('use_replicas', default=False)
+
+PIN_COOKIE = 'db_pin'
+
+# URL names of the read-only event views that may read from a replica. Everything
+# else, including session, user and role lookups on other pages, reads the primary.
+READ_VIEWS = (
+    'dashboard', 'event_list', 'event_detail', 'event_participants', 'event_export',
+    'event_participants_export', 'category_list', 'category_calendar',
+)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'READ_YOUR_WRITES_SECONDS', 10)
+
+
+def read_views():
+    return getattr(settings, 'REPLICA_READ_VIEWS', READ_VIEWS)
+
+
+class ReplicaReads:
+    """
+    A request's switch for replica reads, off until its view is known to be in
+    ``read_views()``. Set as the ``use_replicas`` value and flipped in place, since
+    async requests run ``process_view`` in another thread's context.
+    """
+
+    enabled = False
+
+    def __bool__(self):
+        return self.enabled
+
+
+class use_replicas:
+    """Let reads inside the block go to a replica (outside a transaction on the primary)."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def __enter__(self):
+        self.token = _use_replicas.set(self.enabled)
+
+    def __exit__(self, *exc_info):
+        _use_replicas.reset(self.token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica while ``use_replicas`` is active, everything else
+    to the primary.
+
+    Only GET/HEAD requests to ``read_views()`` without a read-your-writes pin enable
+    replicas (see ReplicaRoutingMiddleware), so management commands, workers, POST
+    handlers and every other page keep reading what they write.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not _use_replicas.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
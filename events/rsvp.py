@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
+
+from .models import Event
+
+User = get_user_model()
+
+# rsvp() results
+REGISTERED = 'registered'
+ALREADY_REGISTERED = 'already_registered'
+FULL = 'full'
+# The event was deleted or archived after the caller loaded it.
+NOT_FOUND = 'not_found'
+
+# Name of the user foreign key on the participants through table
+USER_FIELD = User._meta.model_name
+
+# Rows handed to a single participants.add() call.
+BULK_RSVP_CHUNK_SIZE = 500
+
+
+def resolve_user_ids(identifiers=(), groups=()):
+    """Return the ids of users matching any of the usernames/emails or group members, in one query."""
+    identifiers = [value for value in identifiers if value]
+    condition = Q()
+    if identifiers:
+        condition |= Q(username__in=identifiers) | Q(email__in=identifiers)
+    if groups:
+        condition |= Q(groups__in=groups)
+    if not condition:
+        return []
+    return list(User.objects.filter(condition).values_list('pk', flat=True).distinct())
+
+
+def bulk_rsvp(event, user_ids, chunk_size=BULK_RSVP_CHUNK_SIZE):
+    """
+    Register many users for ``event`` with one participants.add() per chunk.
+
+    Users already registered are skipped by add() itself. Capacity is not enforced:
+    this is the organizer path and may overbook on purpose. Returns how many were added.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    before = event.participant_count
+    for start in range(0, len(user_ids), chunk_size):
+        event.participants.add(*user_ids[start:start + chunk_size])
+    event.refresh_from_db(fields=['participant_count'])
+    return event.participant_count - before
+
+
+def _conditional_insert_sql(connection):
+    through = Event.participants.through
+    qn = connection.ops.quote_name
+    table = qn(through._meta.db_table)
+    event_col = qn(through._meta.get_field('event').column)
+    user_col = qn(through._meta.get_field(USER_FIELD).column)
+    # Insert the participant row only if the event has room and the user isn't
+    # already on it; the NOT EXISTS probe is served by the (event, user) unique index.
+    return (
+        f'INSERT INTO {table} ({event_col}, {user_col}) '
+        f'SELECT e.id, %s FROM {qn(Event._meta.db_table)} e '
+        f'WHERE e.id = %s AND (e.capacity IS NULL OR e.participant_count < e.capacity) '
+        f'AND NOT EXISTS (SELECT 1 FROM {table} p WHERE p.{event_col} = e.id AND p.{user_col} = %s)'
+    )
+
+
+def rsvp(event, user):
+    """
+    Register ``user`` for ``event`` without loading its participants.
+
+    The event row is locked first so concurrent RSVPs for the same event queue up
+    and the capacity check stays exact. Returns REGISTERED, ALREADY_REGISTERED, FULL
+    or NOT_FOUND.
+    """
+    through = Event.participants.through
+    using = router.db_for_write(through, instance=event)
+    with transaction.atomic(using=using):
+        if Event.objects.using(using).select_for_update().filter(pk=event.pk).values_list('pk').first() is None:
+            return NOT_FOUND
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            cursor.execute(_conditional_insert_sql(connection), [user.pk, event.pk, user.pk])
+            inserted = cursor.rowcount == 1
+
+        if not inserted:
+            registered = through.objects.using(using).filter(event=event.pk, **{USER_FIELD: user.pk}).exists()
+            return ALREADY_REGISTERED if registered else FULL
+
+        # The post_add signal participants.add() would send, so counts and confirmations stay in one place.
+        m2m_changed.send(sender=through, instance=event, action='post_add', reverse=False,
+                         model=User, pk_set={user.pk}, using=using)
+    return REGISTERED
@@ -0,0 +1,197 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Upper bound on the number of terms taken from a search box.
+MAX_TERMS = 8
+
+# One row per event, with the category name folded in so it ranks alongside the event's own text.
+DOCUMENT_SQL = (
+    'SELECT e.id, e.name, e.location, e.description, c.name '
+    'FROM events_event e INNER JOIN events_category c ON c.id = e.category_id'
+)
+
+
+def parse_terms(query):
+    return re.findall(r'\w+', query)[:MAX_TERMS]
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table keyed by event id (rowid), ranked with bm25."""
+
+    table = 'events_event_fts'
+    # bm25 column weights: name, location, description, category
+    weights = '10.0, 4.0, 1.0, 2.0'
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} '
+            f"USING fts5(name, location, description, category, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def index(self, cursor, where='', params=()):
+        where_sql = f' WHERE {where}' if where else ''
+        cursor.execute(
+            f'DELETE FROM {self.table} WHERE rowid IN (SELECT e.id FROM events_event e{where_sql})',
+            params,
+        )
+        cursor.execute(
+            f'INSERT INTO {self.table} (rowid, name, location, description, category) '
+            f'{DOCUMENT_SQL}{where_sql}',
+            params,
+        )
+
+    def delete(self, cursor, pks):
+        cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({", ".join(["%s"] * len(pks))})', list(pks))
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, queryset, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match])
+        ).annotate(search_rank=RawSQL(
+            # bm25() is lower-is-better; negate it so every backend ranks higher-is-better.
+            f'SELECT -bm25({self.table}, {self.weights}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = "events_event"."id"',
+            [match],
+            output_field=FloatField(),
+        ))
+
+
+class PostgresSearchBackend:
+    """Weighted tsvector per event in a side table with a GIN index, ranked with ts_rank."""
+
+    table = 'events_eventsearch'
+    config = 'english'
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'event_id bigint PRIMARY KEY REFERENCES events_event (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {self.table}_document_gin ON {self.table} USING GIN (document)'
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def index(self, cursor, where='', params=()):
+        where_sql = f' WHERE {where}' if where else ''
+        cursor.execute(
+            f'INSERT INTO {self.table} (event_id, document) '
+            f'SELECT id, '
+            f"setweight(to_tsvector('{self.config}', name), 'A') || "
+            f"setweight(to_tsvector('{self.config}', location), 'B') || "
+            f"setweight(to_tsvector('{self.config}', category), 'B') || "
+            f"setweight(to_tsvector('{self.config}', description), 'C') "
+            f'FROM ({DOCUMENT_SQL}{where_sql}) AS doc (id, name, location, description, category) '
+            f'ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document',
+            params,
+        )
+
+    def delete(self, cursor, pks):
+        cursor.execute(f'DELETE FROM {self.table} WHERE event_id IN ({", ".join(["%s"] * len(pks))})', list(pks))
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {self.table}')
+
+    def search(self, queryset, terms):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT event_id FROM {self.table} WHERE document @@ to_tsquery('{self.config}', %s)",
+                [tsquery],
+            )
+        ).annotate(search_rank=RawSQL(
+            f"SELECT ts_rank(document, to_tsquery('{self.config}', %s)) FROM {self.table} "
+            f'WHERE event_id = "events_event"."id"',
+            [tsquery],
+            output_field=FloatField(),
+        ))
+
+
+class FallbackSearchBackend:
+    """Unindexed icontains search for databases without a full-text backend."""
+
+    def create(self, cursor):
+        pass
+
+    def drop(self, cursor):
+        pass
+
+    def index(self, cursor, where='', params=()):
+        pass
+
+    def delete(self, cursor, pks):
+        pass
+
+    def clear(self, cursor):
+        pass
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(location__icontains=term)
+                | Q(description__icontains=term) | Q(category__name__icontains=term)
+            )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    return BACKENDS.get(vendor or connection.vendor, FallbackSearchBackend)()
+
+
+def search_events(queryset, query):
+    """Restrict ``queryset`` to events matching ``query``, annotated with ``search_rank``."""
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return get_backend().search(queryset, terms)
+
+
+def index_event(pk):
+    with connection.cursor() as cursor:
+        get_backend().index(cursor, 'e.id = %s', [pk])
+
+
+def index_events(pks):
+    if pks:
+        with connection.cursor() as cursor:
+            get_backend().index(cursor, f'e.id IN ({", ".join(["%s"] * len(pks))})', list(pks))
+
+
+def index_category(pk):
+    with connection.cursor() as cursor:
+        get_backend().index(cursor, 'e.category_id = %s', [pk])
+
+
+def remove_event(pk):
+    remove_events([pk])
+
+
+def remove_events(pks):
+    if pks:
+        with connection.cursor() as cursor:
+            get_backend().delete(cursor, pks)
+
+
+def rebuild_index():
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.clear(cursor)
+        backend.index(cursor)
@@ -1,39 +1,259 @@
-from django.db.models.signals import post_save, m2m_changed
-from django.contrib.auth.models import User
-from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.conf import settings
-from .models import Event
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.contrib.auth.models import Group
+from django.contrib.auth.tokens import default_token_generator
+from django.dispatch import receiver
+from django import urls
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from .models import Category, CustomUser, Event, new_calendar_token
+from . import counters, dispatch, images, outbox, pagecache, search
+from .backends import invalidate_users
+from .roles import invalidate_user_roles
+from .rsvp import USER_FIELD
 
-@receiver(post_save, sender=User)
-def send_activation_email(sender, instance, created, **kwargs):
-    if created:
-        subject = 'Activate Your Account'
-        message = f'Hi {instance.username}, please click the link to activate your account: http://127.0.0.1:8000/activate/{instance.id}/'
-        # In a real app, generate a secure token.
-        
-        print(f"\n[EMAIL SENT] To: {instance.email}\nSubject: {subject}\nBody: {message}\n")
-        send_mail(
-            subject,
-            message,
-            settings.EMAIL_HOST_USER if hasattr(settings, 'EMAIL_HOST_USER') else 'noreply@example.com',
-            [instance.email],
-            fail_silently=False,
+# Emails, queued once the write commits (see events/dispatch.py)
+def queue_activation_emails(user_ids):
+    # Signed with the token generator at send time, checked by ActivateAccountView.
+    users = CustomUser.objects.filter(pk__in=user_ids, is_active=False).exclude(email='')
+    outbox.enqueue_many([
+        (
+            'Activate Your Account',
+            f'Hi {user.username}, please click the link to activate your account: {settings.SITE_URL}'
+            + urls.reverse('activate', args=[urlsafe_base64_encode(force_bytes(user.pk)), default_token_generator.make_token(user)]),
+            [user.email],
         )
+        for user in users
+    ])
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def send_activation_email(sender, instance, created, raw=False, **kwargs):
+    # Only sign-ups start inactive; create_user() and the admin make active users.
+    if created and not raw and not instance.is_active:
+        dispatch.defer(queue_activation_emails, {instance.pk: instance.pk})
+
+def queue_rsvp_confirmations(pairs):
+    # Skip RSVPs undone again before the commit.
+    through = Event.participants.through
+    user_field = f'{USER_FIELD}_id'
+    event_ids = {event_id for event_id, _ in pairs}
+    user_ids = {user_id for _, user_id in pairs}
+    registered = set(through.objects.filter(event_id__in=event_ids, **{f'{user_field}__in': user_ids})
+                     .values_list('event_id', user_field))
+    events = Event.objects.only('name', 'date', 'time', 'location').in_bulk(event_ids)
+    users = CustomUser.objects.only('username', 'email').in_bulk(user_ids)
+    # One query per table and one INSERT for all of the emails
+    outbox.enqueue_many([
+        (
+            f'RSVP Confirmation for {event.name}',
+            f'Hi {user.username},\n\nYou have successfully RSVP\'d for {event.name} on {event.date} at {event.time}.\n\nLocation: {event.location}',
+            [user.email],
+        )
+        for event, user in ((events[event_id], users[user_id]) for event_id, user_id in pairs
+                            if (event_id, user_id) in registered)
+        if user.email
+    ])
 
 @receiver(m2m_changed, sender=Event.participants.through)
-def send_rsvp_confirmation(sender, instance, action, pk_set, **kwargs):
-    if action == 'post_add':
-        for user_id in pk_set:
-            user = User.objects.get(pk=user_id)
-            subject = f'RSVP Confirmation for {instance.name}'
-            message = f'Hi {user.username},\n\nYou have successfully RSVP\'d for {instance.name} on {instance.date} at {instance.time}.\n\nLocation: {instance.location}'
-            
-            print(f"\n[EMAIL SENT] To: {user.email}\nSubject: {subject}\nBody: {message}\n")
-            send_mail(
-                subject,
-                message,
-                settings.EMAIL_HOST_USER if hasattr(settings, 'EMAIL_HOST_USER') else 'noreply@example.com',
-                [user.email],
-                fail_silently=False,
-            )
+def send_rsvp_confirmation(sender, instance, action, reverse, pk_set, using=None, **kwargs):
+    if action == 'post_add' and pk_set:
+        # event.participants.add(users...) or user.rsvp_events.add(events...)
+        pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+        dispatch.defer(queue_rsvp_confirmations, {pair: pair for pair in pairs}, using=using)
+
+# Full-text search index sync
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, **kwargs):
+    search.index_event(instance.pk)
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    search.remove_event(instance.pk)
+
+@receiver(post_save, sender=Category)
+def reindex_category_events(sender, instance, created, **kwargs):
+    if not created:
+        search.index_category(instance.pk)
+
+# Role cache invalidation
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_user_roles(instance.pk)
+    elif action == 'pre_clear':
+        # group.user_set.clear(): members are gone by post_clear, collect them now
+        invalidate_user_roles(*instance.user_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_user_roles(*pk_set)
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_roles_on_user_create(sender, instance, created, **kwargs):
+    # Primary keys can be reused (e.g. SQLite after a rollback), never trust an old entry.
+    if created:
+        invalidate_user_roles(instance.pk)
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_roles_on_group_save(sender, instance, **kwargs):
+    invalidate_user_roles(*instance.user_set.values_list('pk', flat=True))
+
+# Cached request.user invalidation (see events/backends.py)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_users(instance.pk)
+
+# Dashboard counters
+COUNTED_MODELS = {CustomUser: 'users', Event: 'events', Category: 'categories'}
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Category)
+def count_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.adjust(COUNTED_MODELS[sender], 1)
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Category)
+def count_deleted(sender, instance, **kwargs):
+    counters.adjust(COUNTED_MODELS[sender], -1)
+
+# Denormalized Event.participant_count
+@receiver(m2m_changed, sender=Event.participants.through)
+def update_participant_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # event.participants.add/remove/clear(...)
+        events = Event.objects.filter(pk=instance.pk)
+        if action == 'post_add' and pk_set:
+            # pk_set only holds the rows that were actually inserted
+            events.update(participant_count=F('participant_count') + len(pk_set))
+        elif action == 'post_remove':
+            events.recount_participants()
+        elif action == 'post_clear':
+            events.update(participant_count=0)
+    else:
+        # user.rsvp_events.add/remove/clear(...)
+        if action == 'post_add' and pk_set:
+            Event.objects.filter(pk__in=pk_set).update(participant_count=F('participant_count') + 1)
+        elif action == 'post_remove' and pk_set:
+            Event.objects.filter(pk__in=pk_set).recount_participants()
+        elif action == 'pre_clear':
+            # Every one of the user's rows is about to go, so each event loses exactly one.
+            Event.objects.filter(participants=instance).update(participant_count=F('participant_count') - 1)
+
+# Page / fragment cache invalidation
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def bump_event_pages(sender, instance, **kwargs):
+    pagecache.bump(pagecache.LIST_SCOPE, pagecache.event_scope(instance.pk))
+
+@receiver(post_save, sender=Category)
+def bump_category_pages(sender, instance, created, **kwargs):
+    # Category names show on every one of its events' pages. Deleting a category
+    # deletes its events, which bump their own pages.
+    event_ids = [] if created else instance.events.values_list('pk', flat=True)
+    pagecache.bump(pagecache.LIST_SCOPE, *map(pagecache.event_scope, event_ids))
+
+@receiver(post_delete, sender=Category)
+def bump_category_list(sender, instance, **kwargs):
+    pagecache.bump(pagecache.LIST_SCOPE)
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def bump_participant_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            pagecache.bump(pagecache.LIST_SCOPE, pagecache.event_scope(instance.pk))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        pagecache.bump(pagecache.LIST_SCOPE, *map(pagecache.event_scope, pk_set))
+    elif action == 'pre_clear':
+        event_ids = instance.rsvp_events.values_list('pk', flat=True)
+        pagecache.bump(pagecache.LIST_SCOPE, *map(pagecache.event_scope, event_ids))
+
+@receiver(post_save, sender=CustomUser)
+def bump_participant_detail_pages(sender, instance, created, update_fields=None, **kwargs):
+    # Usernames and emails are listed on the detail pages of the events a user joined.
+    if created or (update_fields and set(update_fields) <= {'last_login', 'password', 'calendar_token'}):
+        return
+    event_ids = instance.rsvp_events.values_list('pk', flat=True)
+    pagecache.bump(*map(pagecache.event_scope, event_ids))
+
+# Calendar feed versions (see events/feeds.py)
+@receiver(post_save, sender=Event)
+def bump_event_feeds(sender, instance, created, update_fields=None, **kwargs):
+    scopes = {pagecache.category_scope(instance.category_id)}
+    loaded_category_id = getattr(instance, '_loaded_category_id', None)
+    if loaded_category_id is not None:
+        scopes.add(pagecache.category_scope(loaded_category_id))
+    instance._loaded_category_id = instance.category_id
+
+    # One version per participant, so only when something their feeds show changed.
+    feed_values = instance.feed_values()
+    loaded_feed_values = getattr(instance, '_loaded_feed_values', None)
+    instance._loaded_feed_values = feed_values
+    feed_fields_saved = update_fields is None or not set(update_fields).isdisjoint(Event.FEED_FIELDS)
+    if not created and feed_fields_saved and feed_values != loaded_feed_values:
+        scopes.update(map(pagecache.user_scope, instance.participants.values_list('pk', flat=True)))
+    pagecache.bump(*scopes)
+
+@receiver(pre_delete, sender=Event)
+def bump_deleted_event_feeds(sender, instance, **kwargs):
+    # Participants are gone by post_delete.
+    user_ids = instance.participants.values_list('pk', flat=True)
+    pagecache.bump(pagecache.category_scope(instance.category_id), *map(pagecache.user_scope, user_ids))
+
+@receiver(post_save, sender=CustomUser)
+def revoke_calendar_token(sender, instance, created, **kwargs):
+    # A new password revokes the calendar link along with the sessions. set_password()
+    # leaves the raw password in _password until save() has finished.
+    if not created and getattr(instance, '_password', None) is not None:
+        instance.calendar_token = new_calendar_token()
+        sender.objects.filter(pk=instance.pk).update(calendar_token=instance.calendar_token)
+
+@receiver(post_save, sender=Category)
+def bump_category_feed(sender, instance, created, **kwargs):
+    # The feed is titled with the category's name.
+    if not created:
+        pagecache.bump(pagecache.category_scope(instance.pk))
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def bump_participant_feeds(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            pagecache.bump(pagecache.user_scope(instance.pk))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        pagecache.bump(*map(pagecache.user_scope, pk_set))
+    elif action == 'pre_clear':
+        pagecache.bump(*map(pagecache.user_scope, instance.participants.values_list('pk', flat=True)))
+
+# Image variants
+@receiver(pre_save, sender=CustomUser)
+@receiver(pre_save, sender=Event)
+def reset_image_variants(sender, instance, update_fields=None, **kwargs):
+    # A new upload is an uncommitted FieldFile until the model is saved.
+    instance._new_images = []
+    for field_name in images.image_fields(sender):
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        field_file = getattr(instance, field_name)
+        if field_file and not field_file._committed:
+            setattr(instance, images.variants_field(field_name), {})
+            instance._new_images.append(field_name)
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Event)
+def process_new_images(sender, instance, update_fields=None, **kwargs):
+    new_images = getattr(instance, '_new_images', ())
+    if new_images and update_fields is not None:
+        # The cleared variants were not part of the UPDATE.
+        sender._default_manager.filter(pk=instance.pk).update(
+            **{images.variants_field(field_name): {} for field_name in new_images}
+        )
+    # Otherwise new uploads wait for `manage.py process_images`.
+    if getattr(settings, 'IMAGE_PROCESSING_INLINE', False):
+        for field_name in new_images:
+            transaction.on_commit(lambda field_name=field_name: images.process_instance(instance, field_name))
@@ -0,0 +1,29 @@
+from django import template
+from django.utils.html import format_html
+
+from events.images import VARIANT_FORMATS, srcset, variants_field
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(instance, field_name, sizes='100vw', alt='', css_class=''):
+    """
+    ``<picture>`` for an image field, offering its WebP and JPEG variants through
+    ``srcset``. Falls back to a plain ``<img>`` of the original until they exist.
+    """
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, variants_field(field_name), None) or {}
+    if not variants.get('jpg') or variants.get('source') != field_file.name:
+        return format_html('<img src="{}" alt="{}" class="{}">', field_file.url, alt, css_class)
+
+    sources = format_html(''.join(
+        format_html('<source type="{}" srcset="{}" sizes="{}">', mime, srcset(field_file, variants, ext), sizes)
+        for ext, _, mime in VARIANT_FORMATS if ext != 'jpg'
+    ))
+    largest = variants['jpg'][-1][0]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="lazy"></picture>',
+        sources, field_file.storage.url(largest), srcset(field_file, variants, 'jpg'), sizes,
+        variants['width'], variants['height'], alt, css_class,
+    )
@@ -0,0 +1,138 @@
+"""
+Test support for pinning query counts: record every query with the project code
+that issued it, and fail with that SQL when a view goes over its budget or its
+query count grows with the amount of data. Also the project's test runner.
+"""
+import os
+import sys
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+# Project frames shown per query in failure messages
+ORIGIN_DEPTH = 4
+
+
+def _is_project_frame(filename):
+    filename = os.path.abspath(filename)
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in filename
+        and filename != os.path.abspath(__file__)
+    )
+
+
+def _template_origin():
+    # Queries fired from templates have no project Python frame; find the innermost
+    # template node being rendered instead.
+    frame = sys._getframe()
+    while frame:
+        node = frame.f_locals.get('self') if frame.f_code.co_name == 'render_annotated' else None
+        if node is not None and getattr(node, 'origin', None) and getattr(node, 'token', None):
+            return f'template {node.origin.template_name}:{node.token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+def query_origin():
+    """The innermost project (non-library) frames of the current stack, plus the template line if any."""
+    frames = [frame for frame in traceback.extract_stack() if _is_project_frame(frame.filename)]
+    origin = [f'{os.path.relpath(f.filename, settings.BASE_DIR)}:{f.lineno} in {f.name}' for f in frames[-ORIGIN_DEPTH:]]
+    template = _template_origin()
+    if template:
+        origin.append(template)
+    return origin
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that keeps each query's SQL and origin."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, query_origin()))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+
+@contextmanager
+def record_queries(using='default'):
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+
+
+def format_queries(queries):
+    lines = []
+    for i, (sql, origin) in enumerate(queries, 1):
+        lines.append(f'{i}. {sql}')
+        lines.extend(f'     from {frame}' for frame in origin)
+    return '\n'.join(lines)
+
+
+def extra_queries(smaller, larger):
+    """Queries of ``larger`` beyond those of ``smaller``, matched by SQL shape (params stripped)."""
+    seen = Counter(sql for sql, _ in smaller)
+    extra = []
+    for sql, origin in larger:
+        if seen[sql]:
+            seen[sql] -= 1
+        else:
+            extra.append((sql, origin))
+    return extra
+
+
+class QueryCountAssertionsMixin:
+    """``TestCase`` mixin with query-count assertions that explain their failures."""
+
+    def assertMaxQueries(self, limit, func, msg=''):
+        with record_queries() as recorder:
+            result = func()
+        if len(recorder) > limit:
+            self.fail(
+                f'{msg}{len(recorder)} queries, expected at most {limit}:\n{format_queries(recorder.queries)}'
+            )
+        return result
+
+    def assertConstantQueries(self, runs, limit=None, msg=''):
+        """
+        ``runs`` is ``[(dataset_size, queries)]`` for the same request at growing
+        dataset sizes. Fails if the query count changes with the size, or goes over
+        ``limit``.
+        """
+        (first_size, first), *rest = runs
+        for size, queries in rest:
+            if len(queries) != len(first):
+                self.fail(
+                    f'{msg}{len(first)} queries with {first_size} rows but {len(queries)} with {size}. '
+                    f'Extra queries:\n{format_queries(extra_queries(first, queries))}'
+                )
+        if limit is not None and len(first) > limit:
+            self.fail(f'{msg}{len(first)} queries, expected at most {limit}:\n{format_queries(first)}')
+
+
+class TestRunner(DiscoverRunner):
+    """
+    TEST_RUNNER. Tests render templates without running collectstatic, so static
+    files use the plain storage rather than the manifest STATIC_MANIFEST may select.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.static_storage = override_settings(STORAGES={
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        self.static_storage.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.static_storage.disable()
+        super().teardown_test_environment(**kwargs)
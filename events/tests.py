@@ -1,8 +1,45 @@
-from django.test import TestCase, Client
-from django.contrib.auth.models import User, Group
-from django.urls import reverse
-from .models import Event, Category
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from .models import ArchivedEvent, Event, Category
+from .counters import get_counts
+from .models import OutboundEmail
+from .outbox import claim_due, enqueue, send_pending
+from unittest import mock
 from django.core import mail
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from contextlib import contextmanager
+from django.core.management import call_command
+from io import BytesIO, StringIO
+import json
+from datetime import timedelta
+import re
+import shutil
+import tempfile
+import time
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.utils import timezone
+from .testing import QueryCountAssertionsMixin, record_queries
+from .importer import import_events
+from .search import search_events
+from .checks import check_page_cache_is_shared
+from .pagecache import LIST_SCOPE, get_versions, user_scope
+from .middleware import ReplicaRoutingMiddleware
+from .views import EventListView
+from .management.commands.explain_queries import Command as ExplainQueriesCommand
+from .routers import PIN_COOKIE, ReplicaRouter, _use_replicas, use_replicas
+
+User = get_user_model()
 
 class EventAssignmentTests(TestCase):
     def setUp(self):
@@ -39,13 +76,15 @@ class EventAssignmentTests(TestCase):
         mail.outbox = []
 
         # RSVP
-        response = self.client.get(reverse('rsvp_event', args=[self.event.id]))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('rsvp_event', args=[self.event.id]))
         self.assertRedirects(response, reverse('event_detail', args=[self.event.id]))
         
         # Check Database
         self.assertTrue(self.event.participants.filter(id=self.participant_user.id).exists())
         
-        # Check Email Signal
+        # Check Email Signal (queued, then delivered by the worker)
+        send_pending()
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn('RSVP Confirmation', mail.outbox[0].subject)
 
@@ -64,16 +103,1280 @@ class EventAssignmentTests(TestCase):
         self.assertTemplateUsed(response, 'events/event_form.html')
 
     def test_signup_activation_email(self):
-        response = self.client.post(reverse('sign_up'), {
-            'username': 'newuser',
-            'email': 'new@example.com',
-            'password': 'password123',
-            'first_name': 'New',
-            'last_name': 'User'
-        }) # Valid form data needs validation? UserCreationForm usually requires password confirmation? 
-        # My UserSignupForm inherits UserCreationForm which usually does require password1 and password 2. 
-        # I didn't override it to remove that field. 
-        # So I expect this to fail if I don't provide double passwords.
-        # Let's just test that sending logic works in other test or update this.
-        # I'll skip complex form test here and rely on manual check or simple valid data.
-        pass
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('sign_up'), {
+                'username': 'newuser',
+                'email': 'new@example.com',
+                'password1': 'A-long-password-123',
+                'password2': 'A-long-password-123',
+                'first_name': 'New',
+                'last_name': 'User'
+            })
+        self.assertRedirects(response, reverse('login'))
+        self.assertFalse(User.objects.get(username='newuser').is_active)
+
+        send_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['new@example.com'])
+        link = re.search(r'http://\S+', mail.outbox[0].body).group()
+        self.client.get(link.removeprefix(settings.SITE_URL))
+        self.assertTrue(User.objects.get(username='newuser').is_active)
+
+@override_settings(EVENTS_PAGE_SIZE=2, EVENTS_MAX_PAGE_SIZE=3)
+class EventListPaginationTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.events = [
+            Event.objects.create(
+                name=f'Event {i}',
+                description='Desc',
+                date=f'2026-05-0{i}',
+                time='10:00:00',
+                location='Online',
+                category=self.category
+            )
+            for i in range(1, 6)
+        ]
+
+    def test_first_page_is_bounded(self):
+        response = self.client.get(reverse('event_list'))
+        self.assertEqual(list(response.context['events']), self.events[:2])
+        self.assertTrue(response.context['page_obj'].has_next())
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_next_and_previous_cursors(self):
+        response = self.client.get(reverse('event_list'))
+        next_cursor = response.context['page_obj'].next_cursor
+        response = self.client.get(reverse('event_list'), {'after': next_cursor})
+        self.assertEqual(list(response.context['events']), self.events[2:4])
+
+        previous_cursor = response.context['page_obj'].previous_cursor
+        response = self.client.get(reverse('event_list'), {'before': previous_cursor})
+        self.assertEqual(list(response.context['events']), self.events[:2])
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('event_list'), {'page_size': 50})
+        self.assertEqual(len(response.context['events']), 3)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('event_list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+class EventSearchTests(TestCase):
+    def setUp(self):
+        self.music = Category.objects.create(name='Music', description='Concerts')
+        self.tech = Category.objects.create(name='Tech', description='Tech stuff')
+        self.concert = Event.objects.create(
+            name='Jazz Night', description='Live saxophone quartet', date='2026-05-20',
+            time='20:00:00', location='Blue Hall', category=self.music
+        )
+        self.talk = Event.objects.create(
+            name='Python Meetup', description='Talks about jazz-age computing', date='2026-05-21',
+            time='18:00:00', location='Online', category=self.tech
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse('event_list'), {'search': query})
+        return list(response.context['events'])
+
+    def test_matches_description_and_category(self):
+        self.assertEqual(self.search('saxophone'), [self.concert])
+        self.assertEqual(self.search('music'), [self.concert])
+
+    def test_prefix_match_and_ranking(self):
+        # A hit in the name outranks a hit in the description.
+        self.assertEqual(self.search('jaz'), [self.concert, self.talk])
+
+    def test_ranked_results_paginate(self):
+        response = self.client.get(reverse('event_list'), {'search': 'jaz', 'page_size': 1})
+        self.assertEqual(list(response.context['events']), [self.concert])
+        response = self.client.get(reverse('event_list'), {
+            'search': 'jaz', 'page_size': 1, 'after': response.context['page_obj'].next_cursor
+        })
+        self.assertEqual(list(response.context['events']), [self.talk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.concert.name = 'Blues Night'
+        self.concert.save()
+        self.assertEqual(self.search('blues'), [self.concert])
+
+        self.tech.name = 'Programming'
+        self.tech.save()
+        self.assertEqual(self.search('programming'), [self.talk])
+
+        self.talk.delete()
+        self.assertEqual(self.search('python'), [])
+
+    def test_punctuation_only_query_matches_nothing(self):
+        self.assertEqual(self.search('"*'), [])
+
+class ExplainQueriesCommandTests(TestCase):
+    def test_views_use_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('No full table scans found.', out.getvalue())
+
+    def test_postgres_plan_lines(self):
+        command = ExplainQueriesCommand()
+        with mock.patch('events.management.commands.explain_queries.connection') as connection:
+            connection.vendor = 'postgresql'
+            self.assertEqual(command.full_scan_table('Seq Scan on events_event  (cost=0.00..1.01 rows=1 width=8)'), 'events_event')
+            self.assertEqual(
+                command.full_scan_table('        ->  Parallel Seq Scan on events_event e  (cost=0.00..8.33 rows=83 width=8)'),
+                'events_event',
+            )
+            self.assertIsNone(command.full_scan_table(
+                '  ->  Index Scan using events_event_pkey on events_event  (cost=0.15..8.17 rows=1 width=8)'
+            ))
+
+@override_settings(SHARED_CACHE=True)
+class RoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer_group = Group.objects.create(name='Organizer')
+        self.participant_group = Group.objects.create(name='Participant')
+        self.user = get_user_model().objects.create_user(username='member', password='password')
+        self.user.groups.add(self.participant_group)
+        self.client.force_login(self.user)
+
+    def group_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        return response, [q['sql'] for q in ctx.captured_queries if 'auth_group' in q['sql']]
+
+    def test_warm_requests_skip_group_queries(self):
+        response, queries = self.group_queries(reverse('dashboard'))
+        self.assertTemplateUsed(response, 'events/dashboard_participant.html')
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.group_queries(reverse('dashboard'))
+        self.assertTemplateUsed(response, 'events/dashboard_participant.html')
+        self.assertEqual(queries, [])
+
+    def test_group_change_invalidates_cache(self):
+        self.client.get(reverse('dashboard'))
+        self.user.groups.add(self.organizer_group)
+        response = self.client.get(reverse('category_list'))
+        self.assertTemplateUsed(response, 'events/category_list.html')
+
+        self.organizer_group.user_set.remove(self.user)
+        response = self.client.get(reverse('category_list'))
+        self.assertContains(response, 'You are not authorized')
+
+@override_settings(SHARED_CACHE=True)
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.admin = get_user_model().objects.create_user(username='boss', password='password')
+        self.admin.groups.add(Group.objects.create(name='Admin'))
+
+    def create_event(self, name, date):
+        return Event.objects.create(
+            name=name, description='Desc', date=date, time='10:00:00',
+            location='Online', category=self.category
+        )
+
+    def test_counts_are_cached_and_adjusted_on_commit(self):
+        self.assertEqual(get_counts('events', 'categories'), {'events': 0, 'categories': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            event = self.create_event('Tech Talk', '2030-01-01')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_counts('events')['events'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertEqual(get_counts('events')['events'], 0)
+
+    def test_recount_heals_drift(self):
+        get_counts('users')
+        cache.set('events:counter:users', 42)
+        call_command('recount_counters', 'users', stdout=StringIO())
+        self.assertEqual(get_counts('users')['users'], 1)
+
+    @override_settings(DASHBOARD_EVENT_LIMIT=1)
+    def test_admin_dashboard_lists_capped_upcoming_events(self):
+        self.create_event('Past', '2000-01-01')
+        soon = self.create_event('Soon', '2090-01-01')
+        self.create_event('Later', '2090-06-01')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(list(response.context['events']), [soon])
+        self.assertEqual(response.context['total_events'], 3)
+
+class ParticipantCountTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=self.category
+        )
+        self.other = Event.objects.create(
+            name='Meetup', description='Desc', date='2026-05-21', time='10:00:00',
+            location='Online', category=self.category
+        )
+        User = get_user_model()
+        self.users = [User.objects.create_user(username=f'user{i}') for i in range(3)]
+
+    def count(self, event):
+        event.refresh_from_db(fields=['participant_count'])
+        return event.participant_count
+
+    def test_forward_add_remove_clear(self):
+        self.event.participants.add(*self.users)
+        self.event.participants.add(self.users[0])  # already registered
+        self.assertEqual(self.count(self.event), 3)
+        self.event.participants.remove(self.users[0], self.users[0])
+        self.assertEqual(self.count(self.event), 2)
+        self.event.participants.clear()
+        self.assertEqual(self.count(self.event), 0)
+
+    def test_reverse_add_remove_clear(self):
+        user = self.users[0]
+        user.rsvp_events.add(self.event, self.other)
+        self.assertEqual((self.count(self.event), self.count(self.other)), (1, 1))
+        user.rsvp_events.remove(self.other)
+        self.assertEqual(self.count(self.other), 0)
+        user.rsvp_events.clear()
+        self.assertEqual(self.count(self.event), 0)
+
+    def test_save_does_not_overwrite_count(self):
+        stale = Event.objects.get(pk=self.event.pk)
+        self.event.participants.add(*self.users)
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(self.count(self.event), 3)
+
+    def test_recount_command_and_popular_sort(self):
+        self.other.participants.add(*self.users)
+        Event.objects.update(participant_count=0)
+        caches['pages'].clear()
+        detail_url = reverse('event_detail', args=[self.other.pk])
+        self.assertContains(self.client.get(detail_url), 'Participants (0)')
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('recount_participants', '--batch-size', '1', stdout=out)
+        self.assertEqual(self.count(self.other), 3)
+        self.assertIn('for 1 events', out.getvalue())
+        self.assertContains(self.client.get(detail_url), 'Participants (3)')
+
+        response = self.client.get(reverse('event_list'), {'sort': 'popular'})
+        self.assertEqual(list(response.context['events']), [self.other, self.event])
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=category
+        )
+        self.user = get_user_model().objects.create_user(username='member', email='member@example.com')
+
+    def test_rsvp_only_enqueues(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.participants.add(self.user)
+        self.assertEqual(mail.outbox, [])
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.to, ['member@example.com'])
+
+        call_command('send_queued_mail', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('RSVP Confirmation', mail.outbox[0].subject)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutboundEmail.SENT)
+
+    @override_settings(EMAIL_QUEUE_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.participants.add(self.user)
+        queued = OutboundEmail.objects.get()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=ConnectionError('down')):
+            self.assertEqual(send_pending(), (0, 1))
+            queued.refresh_from_db()
+            self.assertEqual((queued.status, queued.attempts), (OutboundEmail.PENDING, 1))
+            self.assertEqual(send_pending(), (0, 0))  # not due yet
+
+            OutboundEmail.objects.update(next_attempt_at=queued.created_at)
+            self.assertEqual(send_pending(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutboundEmail.FAILED)
+        self.assertIn('down', queued.last_error)
+
+class OutboxClaimTests(TransactionTestCase):
+    def test_sends_outside_a_transaction_with_the_batch_claimed(self):
+        queued = enqueue('Hello', 'Body', ['member@example.com'])
+
+        def send_messages(messages):
+            # Other workers skip the claimed row while this one talks to the mail server.
+            self.assertFalse(connection.in_atomic_block)
+            self.assertEqual(claim_due(10), [])
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            self.assertEqual(send_pending(), (1, 0))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (OutboundEmail.SENT, 1))
+
+
+class DispatchTests(TransactionTestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=category
+        )
+        self.user = User.objects.create_user(username='member', email='member@example.com')
+
+    def test_side_effects_wait_for_commit_and_coalesce(self):
+        with transaction.atomic():
+            self.event.participants.add(self.user)
+            self.event.participants.remove(self.user)
+            self.user.rsvp_events.add(self.event)
+            self.assertFalse(OutboundEmail.objects.exists())
+        self.assertEqual(list(OutboundEmail.objects.values_list('to', flat=True)), [['member@example.com']])
+
+    def test_rollback_drops_side_effects(self):
+        with transaction.atomic():
+            with transaction.atomic():
+                self.event.participants.add(self.user)
+                transaction.set_rollback(True)
+            self.event.participants.add(self.user)
+            self.event.participants.remove(self.user)
+        with transaction.atomic():
+            self.event.participants.add(self.user)
+            transaction.set_rollback(True)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+
+class BulkRSVPTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=category
+        )
+        User = get_user_model()
+        self.cohort = Group.objects.create(name='Cohort')
+        self.users = [
+            User.objects.create_user(username=f'student{i}', email=f'student{i}@example.com')
+            for i in range(20)
+        ]
+        self.cohort.user_set.add(*self.users)
+        organizer = User.objects.create_user(username='org', password='password')
+        organizer.groups.add(Group.objects.create(name='Organizer'))
+        self.client.force_login(organizer)
+
+    def test_query_count_does_not_grow_with_cohort(self):
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('event_bulk_rsvp', args=[self.event.pk]), {'groups': [self.cohort.pk]}
+            )
+        self.assertRedirects(response, reverse('event_detail', args=[self.event.pk]), fetch_redirect_response=False)
+        self.assertEqual(self.event.participants.count(), 20)
+        self.assertLess(len(ctx.captured_queries), 20)
+        self.assertEqual(OutboundEmail.objects.count(), 20)
+
+    def test_command_skips_existing_participants(self):
+        self.event.participants.add(self.users[0])
+        out = StringIO()
+        call_command('add_participants', self.event.pk, 'student0', 'student1@example.com', stdout=out)
+        self.assertIn('Registered 1 new participant(s)', out.getvalue())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 2)
+
+class RSVPEngineTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=category, capacity=1
+        )
+        participants = Group.objects.create(name='Participant')
+        User = get_user_model()
+        self.first = User.objects.create_user(username='first', email='first@example.com')
+        self.second = User.objects.create_user(username='second', email='second@example.com')
+        participants.user_set.add(self.first, self.second)
+        self.url = reverse('rsvp_event', args=[self.event.pk])
+
+    def rsvp_as(self, user):
+        self.client.force_login(user)
+        return self.client.post(self.url, HTTP_ACCEPT='application/json')
+
+    def test_register_then_already_registered(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.rsvp_as(self.first)
+        self.assertEqual((response.status_code, response.json()), (201, {'result': 'registered'}))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.rsvp_as(self.first)
+        self.assertEqual((response.status_code, response.json()), (200, {'result': 'already_registered'}))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participant_count, 1)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_capacity_is_enforced(self):
+        self.rsvp_as(self.first)
+        response = self.rsvp_as(self.second)
+        self.assertEqual((response.status_code, response.json()), (409, {'result': 'full'}))
+        self.assertFalse(self.event.participants.filter(pk=self.second.pk).exists())
+
+    def test_event_removed_during_request(self):
+        def get_then_delete(model, **kwargs):
+            event = model.objects.get(**kwargs)
+            model.objects.filter(pk=event.pk).delete()
+            return event
+
+        with mock.patch('events.views.get_object_or_404', get_then_delete):
+            response = self.rsvp_as(self.first)
+        self.assertEqual((response.status_code, response.json()), (404, {'result': 'not_found'}))
+
+        self.event = Event.objects.create(
+            name='Meetup', description='Desc', date='2026-05-21', time='10:00:00',
+            location='Online', category=self.event.category
+        )
+        with mock.patch('events.views.get_object_or_404', get_then_delete):
+            response = self.client.post(reverse('rsvp_event', args=[self.event.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_does_not_register(self):
+        self.client.force_login(self.first)
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('event_detail', args=[self.event.pk]), fetch_redirect_response=False)
+        self.assertFalse(self.event.participants.exists())
+
+@override_settings(VIEW_TIMING_ENABLED=True, VIEW_TIMING_SAMPLE_RATE=1.0, VIEW_TIMING_HEADER=True)
+class ViewTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.stats_location = f'{directory}/viewstats'
+        stats_cache = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': self.stats_location}
+        self.enterContext(override_settings(CACHES={**settings.CACHES, 'viewstats': stats_cache}))
+        category = Category.objects.create(name='Tech', description='Tech stuff')
+        Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=category
+        )
+
+    def test_server_timing_header_and_stats(self):
+        for _ in range(3):
+            response = self.client.get(reverse('event_list'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries, \d connects", render;dur=[\d.]+, total;dur=[\d.]+')
+
+        # Anonymous pages are rendered by the page cache, not by the handler.
+        caches['pages'].clear()
+        response = self.client.get(reverse('event_list'), {'page_size': 5})
+        self.assertGreater(float(re.search(r'render;dur=([\d.]+)', response['Server-Timing']).group(1)), 0)
+
+        # `manage.py view_stats` runs in its own process, with its own cache objects.
+        caches._connections.viewstats = FileBasedCache(self.stats_location, {})
+        out = StringIO()
+        call_command('view_stats', stdout=out)
+        self.assertRegex(out.getvalue(), r'event_list\s+4 ')
+
+        call_command('view_stats', '--reset', stdout=StringIO())
+        out = StringIO()
+        call_command('view_stats', stdout=out)
+        self.assertIn('No samples recorded', out.getvalue())
+
+    @override_settings(VIEW_TIMING_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('event_list'))
+        self.assertNotIn('Server-Timing', response)
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        caches['pages'].clear()
+        self.category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=self.category
+        )
+        self.user = get_user_model().objects.create_user(username='member', email='member@example.com')
+
+    def test_anonymous_list_is_served_from_cache(self):
+        self.client.get(reverse('event_list'), {'category': self.category.pk})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('event_list'), {'category': self.category.pk, 'search': ''})
+        self.assertContains(response, 'Tech Talk')
+
+        self.event.name = 'Renamed Talk'
+        self.event.save()
+        response = self.client.get(reverse('event_list'), {'category': self.category.pk})
+        self.assertContains(response, 'Renamed Talk')
+
+    def test_versions_expire_with_the_pages(self):
+        # A bump made in another worker's cache reaches this one within PAGE_CACHE_TIMEOUT.
+        version = get_versions(LIST_SCOPE)[LIST_SCOPE]
+        with mock.patch('time.time', return_value=time.time() + settings.PAGE_CACHE_TIMEOUT + 1):
+            self.assertGreater(get_versions(LIST_SCOPE)[LIST_SCOPE], version)
+
+    @override_settings(WEB_CONCURRENCY=4)
+    def test_check_warns_about_per_process_page_cache(self):
+        self.assertEqual([error.id for error in check_page_cache_is_shared(None)], ['events.W001'])
+        with override_settings(WEB_CONCURRENCY=1):
+            self.assertEqual(check_page_cache_is_shared(None), [])
+
+    def test_conditional_get_returns_304(self):
+        url = reverse('event_detail', args=[self.event.pk])
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.event.participants.add(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'member@example.com')
+
+    def test_category_rename_invalidates_detail(self):
+        url = reverse('event_detail', args=[self.event.pk])
+        self.client.get(url)
+        self.category.name = 'Science'
+        self.category.save()
+        self.assertContains(self.client.get(url), 'Science')
+
+    def test_authenticated_list_reuses_table_fragment(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('event_list'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('event_list'))
+        self.assertContains(response, 'Tech Talk')
+        self.assertFalse([q for q in ctx.captured_queries if 'events_event' in q['sql'] or 'events_category' in q['sql']])
+
+    def test_table_fragment_evicted_before_render(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('event_list'))
+        get_context_data = EventListView.get_context_data
+
+        def evict_fragments(view, **kwargs):
+            context = get_context_data(view, **kwargs)
+            caches['pages'].clear()
+            return context
+
+        with mock.patch.object(EventListView, 'get_context_data', evict_fragments):
+            self.assertContains(self.client.get(reverse('event_list')), 'Tech Talk')
+        self.assertContains(self.client.get(reverse('event_list')), 'Tech Talk')
+
+
+@override_settings(PARTICIPANTS_PAGE_SIZE=2)
+class ParticipantPaginationTests(TestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.category = Category.objects.create(name='Tech', description='Tech stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=self.category
+        )
+        self.users = [
+            get_user_model().objects.create_user(username=f'guest{i}', email=f'guest{i}@example.com')
+            for i in range(5)
+        ]
+        self.event.participants.add(*self.users)
+
+    def test_detail_shows_first_page_only(self):
+        response = self.client.get(reverse('event_detail', args=[self.event.pk]))
+        self.assertContains(response, 'guest0@example.com')
+        self.assertContains(response, 'guest1@example.com')
+        self.assertNotContains(response, 'guest2@example.com')
+        self.assertContains(response, 'Load more participants')
+
+    def test_json_pages_follow_cursor(self):
+        url = reverse('event_participants', args=[self.event.pk])
+        names, after = [], None
+        while True:
+            data = self.client.get(url, {'format': 'json', **({'after': after} if after else {})}).json()
+            names += [p['username'] for p in data['participants']]
+            after = data['next']
+            if not after:
+                break
+        self.assertEqual(names, [u.username for u in self.users])
+
+    def test_partial_page(self):
+        url = reverse('event_participants', args=[self.event.pk])
+        first = self.client.get(url, {'format': 'json'}).json()
+        response = self.client.get(url, {'after': first['next']})
+        self.assertContains(response, 'guest2')
+        self.assertContains(response, 'guest3')
+        self.assertNotContains(response, 'guest0')
+        self.assertEqual(self.client.get(reverse('event_participants', args=[999])).status_code, 404)
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_MAX_DIMENSION=800, IMAGE_PROCESSING_INLINE=True)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.category = Category.objects.create(name='Tech', description='Tech stuff')
+
+    def upload(self, size=(1600, 1200)):
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera Maker'
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, 'JPEG', exif=exif)
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def create_event(self):
+        return Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=self.category, event_image=self.upload()
+        )
+
+    def test_upload_is_cleaned_and_variants_written(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = self.create_event()
+        event.refresh_from_db()
+        variants = event.event_image_variants
+
+        self.assertEqual(variants['source'], event.event_image.name)
+        self.assertRegex(event.event_image.name, r'^event_images/photo\.[0-9a-f]{12}\.jpg$')
+        with Image.open(event.event_image.path) as original:
+            self.assertEqual(original.size, (800, 600))
+            self.assertFalse(original.getexif())
+        self.assertEqual([width for _, width in variants['webp']], [320, 640])
+        for name, width in variants['webp'] + variants['jpg']:
+            with Image.open(event.event_image.storage.path(name)) as variant:
+                self.assertEqual(variant.width, width)
+
+        html = Template("{% load images %}{% responsive_image event 'event_image' sizes='50vw' %}").render(
+            Context({'event': event})
+        )
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('640w', html)
+
+    @override_settings(IMAGE_PROCESSING_INLINE=False)
+    def test_command_processes_pending_and_backfills(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = self.create_event()
+        event.refresh_from_db()
+        self.assertEqual(event.event_image_variants, {})
+        html = Template("{% load images %}{% responsive_image event 'event_image' %}").render(Context({'event': event}))
+        self.assertNotIn('srcset', html)
+
+        call_command('process_images', stdout=StringIO())
+        event.refresh_from_db()
+        self.assertTrue(event.event_image_variants['jpg'])
+        # Users still on the (missing) default picture are recorded without variants.
+        user = get_user_model().objects.create_user(username='member')
+        call_command('process_images', stdout=StringIO())
+        user.refresh_from_db()
+        self.assertEqual(user.profile_picture_variants, {'source': 'profile_pics/default.jpg'})
+
+        name = event.event_image.name
+        call_command('process_images', '--all', stdout=StringIO())
+        event.refresh_from_db()
+        self.assertEqual(event.event_image.name, name)
+
+
+class BenchmarkTests(TestCase):
+    def test_generate_run_and_compare(self):
+        from . import benchmark
+        benchmark.generate(users=30, events=20, categories=3, rsvps=100, batch_size=7, log=lambda msg: None)
+        self.assertEqual(Event.objects.count(), 20)
+        self.assertEqual(
+            sum(Event.objects.values_list('participant_count', flat=True)),
+            Event.participants.through.objects.count(),
+        )
+
+        results = benchmark.run(iterations=2, warmup=1, only=['event_list', 'dashboard', 'rsvp'])
+        self.assertIn('event_list_search:participant', results)
+        self.assertGreater(results['dashboard:admin']['queries'], 0)
+
+        baseline = {name: dict(row) for name, row in results.items()}
+        self.assertEqual(benchmark.compare(results, baseline), [])
+        baseline['rsvp']['queries'] -= 1
+        baseline['rsvp']['p95'] = results['rsvp']['p95'] / 2
+        self.assertEqual(len(benchmark.compare(results, baseline)), 2)
+
+        results = benchmark.run(iterations=4, warmup=1, only=['event_detail', 'rsvp'], asgi=True, concurrency=2)
+        self.assertEqual(set(results), {'event_detail', 'event_detail:participant'})
+        self.assertIsNone(results['event_detail']['queries'])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.organizer = get_user_model().objects.create_user(username='organizer', email='organizer@example.com')
+        self.organizer.groups.add(Group.objects.create(name='Organizer'))
+        self.participant = get_user_model().objects.create_user(username='guest', email='guest@example.com')
+        self.participant.groups.add(Group.objects.create(name='Participant'))
+        self.tech = Category.objects.create(name='Tech', description='Tech stuff')
+        music = Category.objects.create(name='Music', description='Music stuff')
+        self.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date='2026-05-20', time='10:00:00',
+            location='Online', category=self.tech
+        )
+        Event.objects.create(
+            name='Concert', description='Desc', date='2026-05-21', time='20:00:00',
+            location='Dhaka', category=music
+        )
+        self.event.participants.add(self.participant)
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_events_csv_uses_list_filters(self):
+        self.client.force_login(self.organizer)
+        response = self.client.get(reverse('event_export'), {'category': self.tech.pk})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="events.csv"')
+        lines = self.content(response).splitlines()
+        self.assertEqual(lines[0], 'id,name,date,time,location,category__name,participant_count')
+        self.assertEqual(lines[1:], [f'{self.event.pk},Tech Talk,2026-05-20,10:00:00,Online,Tech,1'])
+
+    def test_roster_ndjson(self):
+        self.client.force_login(self.organizer)
+        response = self.client.get(reverse('event_participants_export', args=[self.event.pk]), {'format': 'ndjson'})
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([row['email'] for row in rows], ['guest@example.com'])
+        self.assertEqual(self.client.get(reverse('event_export'), {'format': 'xml'}).status_code, 400)
+
+    def test_participants_cannot_export(self):
+        self.client.force_login(self.participant)
+        response = self.client.get(reverse('event_participants_export', args=[self.event.pk]))
+        self.assertNotIn('Content-Disposition', response)
+        self.assertContains(response, 'You are not authorized')
+
+
+class ImportTests(TestCase):
+    CSV = (
+        'external_id,name,description,date,time,location,category,capacity\n'
+        'p-1,Jazz Night,Live set,2027-01-02,19:00,Hall,music,50\n'
+        ',Open Mic,Bring a song,2027-01-03,18:00,Cafe,Music,\n'
+        'p-2,Broken,Desc,someday,10:00,Room,Nope,\n'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.music = Category.objects.create(name='Music', description='Music stuff')
+
+    def import_csv(self, text, *args):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = f'{directory}/events.csv'
+        with open(path, 'w') as f:
+            f.write(text)
+        out, err = StringIO(), StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_events', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_skips_invalid_rows_and_upserts(self):
+        get_counts('events')
+        out, err = self.import_csv(self.CSV, '--batch-size', '1')
+        self.assertIn('2 created, 0 updated, 1 skipped', out)
+        self.assertIn('line 4: date: Enter a valid date.; category: Unknown category.', err)
+        self.assertEqual(get_counts('events')['events'], 2)
+
+        jazz = Event.objects.get(external_id='p-1')
+        self.assertEqual((jazz.category, jazz.capacity), (self.music, 50))
+        self.assertEqual(list(search_events(Event.objects.all(), 'jazz')), [jazz])
+
+        out, err = self.import_csv(self.CSV.replace('Jazz Night', 'Jazz Brunch'))
+        self.assertIn('1 created, 1 updated, 1 skipped', out)
+        jazz.refresh_from_db()
+        self.assertEqual(jazz.name, 'Jazz Brunch')
+        self.assertEqual(Event.objects.filter(external_id='p-1').count(), 1)
+
+    def test_ics_import(self):
+        feed = [
+            'BEGIN:VCALENDAR', 'BEGIN:VEVENT', 'UID:talk-1@partner', 'SUMMARY:Talk\\, with comma',
+            'DESCRIPTION:First line\\nsecond', '  line', 'DTSTART;VALUE=DATE:20270105',
+            'LOCATION:Online', 'CATEGORIES:Tech,Science', 'END:VEVENT', 'END:VCALENDAR',
+        ]
+        self.assertEqual(import_events(feed, 'ics', create_categories=True), (1, 0, 0))
+        event = Event.objects.get(external_id='talk-1@partner')
+        self.assertEqual(event.name, 'Talk, with comma')
+        self.assertEqual(event.description, 'First line\nsecond line')
+        self.assertEqual((str(event.date), event.category.name), ('2027-01-05', 'Tech'))
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['pages'].clear()
+        self.user = User.objects.create_user(username='guest', email='guest@example.com')
+        self.tech = Category.objects.create(name='Tech', description='Tech stuff')
+        today = timezone.localdate()
+        self.event = Event.objects.create(
+            name='Tech Talk, part 1', description='Line one\nline two ' + 'x' * 80, date=today,
+            time='10:00:00', location='Online', category=self.tech
+        )
+        self.other = Event.objects.create(
+            name='Workshop', description='Desc', date=today, time='12:00:00', location='Lab', category=self.tech
+        )
+        Event.objects.create(
+            name='Old Meetup', description='Desc', date=today - timedelta(days=365),
+            time='12:00:00', location='Lab', category=self.tech
+        )
+        self.event.participants.add(self.user)
+        self.url = reverse('user_calendar', args=[self.user.calendar_token])
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_user_feed_revalidates_without_event_queries(self):
+        response = self.client.get(self.url)
+        body = self.content(response)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertIn('SUMMARY:Tech Talk\\, part 1\r\n', body)
+        self.assertNotIn('Workshop', body)
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n'))
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+        etag = response['ETag']
+        # Only the token lookup.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+        self.other.participants.add(self.user)
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('SUMMARY:Workshop', self.content(response))
+
+        self.assertEqual(self.client.get(self.url.replace('.ics', 'x.ics')).status_code, 404)
+
+    def test_only_feed_changes_bump_participant_feeds(self):
+        scope = user_scope(self.user.pk)
+        version = get_versions(scope)[scope]
+        event = Event.objects.get(pk=self.event.pk)
+        with mock.patch('time.time', return_value=time.time() + 60):
+            event.capacity = 10
+            event.save()
+            event.save(update_fields=['capacity'])
+            self.assertEqual(get_versions(scope)[scope], version)
+            event.location = 'Main hall'
+            event.save()
+            self.assertGreater(get_versions(scope)[scope], version)
+
+    def test_token_is_random_and_revocable(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse('profile')), self.url)
+        self.assertEqual(self.client.get(reverse('calendar_token_reset')).status_code, 405)
+        self.assertRedirects(self.client.post(reverse('calendar_token_reset')), reverse('profile'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        new_url = reverse('user_calendar', args=[User.objects.get(pk=self.user.pk).calendar_token])
+        self.assertNotEqual(new_url, self.url)
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+
+    def test_password_change_revokes_token(self):
+        old_token = self.user.calendar_token
+        self.user.set_password('new-pass-123')
+        self.user.save()
+        self.assertNotEqual(User.objects.get(pk=self.user.pk).calendar_token, old_token)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(reverse('user_calendar', args=[self.user.calendar_token])).status_code, 200)
+
+    def test_inactive_user_feed_is_gone(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_category_feed_follows_event_changes(self):
+        url = reverse('category_calendar', args=[self.tech.pk])
+        response = self.client.get(url)
+        body = self.content(response)
+        self.assertIn('X-WR-CALNAME:Tech', body)
+        self.assertIn('SUMMARY:Workshop', body)
+        self.assertNotIn('Old Meetup', body)
+        etag = response['ETag']
+
+        music = Category.objects.create(name='Music', description='Music stuff')
+        event = Event.objects.get(pk=self.other.pk)
+        event.category = music
+        event.save()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertNotIn('Workshop', self.content(response))
+        self.assertIn('SUMMARY:Workshop', self.content(self.client.get(reverse('category_calendar', args=[music.pk]))))
+        self.assertEqual(self.client.get(reverse('category_calendar', args=[0])).status_code, 404)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['pages'].clear()
+        self.user = User.objects.create_user(username='guest', email='guest@example.com')
+        self.tech = Category.objects.create(name='Tech', description='Tech stuff')
+        today = timezone.localdate()
+        self.old = [
+            Event.objects.create(
+                name=f'Old Talk {i}', description='Desc', date=today - timedelta(days=200 + i),
+                time='10:00:00', location='Online', category=self.tech, external_id=f'old-{i}',
+            )
+            for i in range(3)
+        ]
+        self.recent = Event.objects.create(
+            name='Recent Talk', description='Desc', date=today - timedelta(days=5), time='10:00:00',
+            location='Online', category=self.tech
+        )
+        self.old[0].participants.add(self.user)
+
+    def archive(self):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_events', '--batch-size', '2', stdout=out)
+        return out.getvalue()
+
+    def test_moves_past_events_with_participants(self):
+        get_counts('events')
+        self.assertIn('Archived 3 event(s)', self.archive())
+
+        self.assertEqual(list(Event.objects.all()), [self.recent])
+        self.assertEqual(get_counts('events')['events'], 1)
+        self.assertEqual(list(search_events(Event.objects.all(), 'old')), [])
+        archived = ArchivedEvent.objects.get(pk=self.old[0].pk)
+        self.assertEqual((archived.name, archived.external_id), ('Old Talk 0', 'old-0'))
+        self.assertEqual(list(archived.participants.all()), [self.user])
+        self.assertFalse(Event.participants.through.objects.filter(event_id=self.old[0].pk).exists())
+        self.assertIn('Archived 0 event(s)', self.archive())
+
+    def test_archived_events_stay_readable(self):
+        self.archive()
+        response = self.client.get(reverse('event_detail', args=[self.old[0].pk]))
+        self.assertContains(response, 'Old Talk 0')
+        self.assertContains(response, 'guest@example.com')
+        self.assertNotContains(response, reverse('rsvp_event', args=[self.old[0].pk]))
+        response = self.client.get(reverse('event_participants', args=[self.old[0].pk]), {'format': 'json'})
+        self.assertEqual(response.json()['participants'], [{'username': 'guest', 'email': 'guest@example.com'}])
+        self.assertEqual(self.client.get(reverse('event_detail', args=[0])).status_code, 404)
+
+    def test_import_leaves_archived_events_alone(self):
+        self.archive()
+        rows = [
+            'external_id,name,description,date,time,location,category,capacity',
+            'old-1,Old Talk Again,Desc,2020-01-01,10:00,Online,Tech,',
+        ]
+        self.assertEqual(import_events(rows, 'csv'), (0, 0, 1))
+        self.assertFalse(Event.objects.filter(external_id='old-1').exists())
+
+
+@contextmanager
+def other_process_cache():
+    """Run the block with the default cache of another worker process (its own LocMem)."""
+    own = caches['default']
+    caches._connections.default = LocMemCache('other-process', {})
+    try:
+        yield
+    finally:
+        caches._connections.default = own
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=['events.backends.CachedModelBackend'],
+)
+class SessionUserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='member', email='member@example.com', password='old-password-1'
+        )
+        self.client.login(username='member', password='old-password-1')
+
+    def test_warm_request_makes_no_queries(self):
+        self.client.get(reverse('profile'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'member@example.com')
+
+    def test_saving_user_drops_cached_copy(self):
+        self.client.get(reverse('profile'))
+        self.user.email = 'changed@example.com'
+        self.user.save()
+        self.assertContains(self.client.get(reverse('profile')), 'changed@example.com')
+
+        self.user.set_password('new-password-1')
+        self.user.save()
+        self.assertRedirects(self.client.get(reverse('profile')), '/login/?next=/profile/')
+
+
+class RolesWithoutSharedCacheTests(TestCase):
+    """The default settings (no REDIS_URL): another worker's group changes apply at once."""
+
+    def setUp(self):
+        self.organizer_group = Group.objects.create(name='Organizer')
+        self.user = get_user_model().objects.create_user(username='member', password='password')
+        self.user.groups.add(self.organizer_group)
+        self.client.force_login(self.user)
+        self.assertTemplateUsed(self.client.get(reverse('category_list')), 'events/category_list.html')
+
+    def test_group_removed_in_another_process(self):
+        with other_process_cache():
+            self.organizer_group.user_set.remove(self.user)
+        self.assertContains(self.client.get(reverse('category_list')), 'You are not authorized')
+
+
+class CountersWithoutSharedCacheTests(TestCase):
+    """The default settings (no REDIS_URL): every worker sees the same totals."""
+
+    def test_category_created_in_another_process(self):
+        cache.clear()
+        self.assertEqual(get_counts('categories'), {'categories': 0})
+        with other_process_cache(), self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Tech', description='Tech stuff')
+        self.assertEqual(get_counts('categories'), {'categories': 1})
+
+
+class SessionWithoutSharedCacheTests(TestCase):
+    """The default settings (no REDIS_URL): another worker's writes apply at once."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='member', email='member@example.com', password='old-password-1'
+        )
+        self.client.login(username='member', password='old-password-1')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+
+    def test_password_change_in_another_process(self):
+        with other_process_cache():
+            self.user.set_password('new-password-1')
+            self.user.save()
+        self.assertRedirects(self.client.get(reverse('profile')), '/login/?next=/profile/')
+
+    def test_logout_in_another_process(self):
+        session_cookie = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        with other_process_cache():
+            self.client.post(reverse('logout'))
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = session_cookie
+        self.assertRedirects(self.client.get(reverse('profile')), '/login/?next=/profile/')
+
+
+# Maximum queries per URL name for (anonymous, Participant, Organizer, Admin), cold caches.
+QUERY_BUDGETS = {
+    'dashboard': (0, 4, 6, 7),
+    'sign_up': (0, 2, 2, 2),
+    'login': (0, 2, 2, 2),
+    'logout': (0, 0, 0, 0),
+    'activate': (1, 1, 1, 1),
+    'profile': (0, 2, 2, 2),
+    'profile_edit': (0, 2, 2, 2),
+    'change_password': (0, 2, 2, 2),
+    'password_reset': (0, 2, 2, 2),
+    'password_reset_done': (0, 2, 2, 2),
+    'password_reset_confirm': (1, 3, 3, 3),
+    'password_reset_complete': (0, 2, 2, 2),
+    'event_list': (2, 4, 4, 4),
+    'event_detail': (2, 5, 5, 5),
+    'event_create': (0, 3, 4, 4),
+    'event_update': (0, 3, 5, 5),
+    'event_delete': (0, 3, 4, 4),
+    'rsvp_event': (0, 3, 3, 3),
+    'event_participants': (2, 4, 4, 4),
+    'event_bulk_rsvp': (0, 3, 5, 5),
+    'event_export': (0, 3, 4, 4),
+    'event_participants_export': (0, 3, 5, 5),
+    'category_list': (0, 3, 4, 4),
+    'category_create': (0, 3, 3, 3),
+    'category_update': (0, 3, 4, 4),
+    'category_delete': (0, 3, 4, 4),
+    'category_calendar': (2, 2, 2, 2),
+    'user_calendar': (2, 2, 2, 2),
+    'calendar_token_reset': (0, 2, 2, 2),
+}
+QUERY_ROLES = (None, 'Participant', 'Organizer', 'Admin')
+DATASET_SIZES = (2, 12)
+
+
+class QueryCountTests(QueryCountAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.groups = {name: Group.objects.create(name=name) for name in QUERY_ROLES if name}
+        cls.role_users = {}
+        for name, group in cls.groups.items():
+            user = get_user_model().objects.create_user(username=name.lower(), email=f'{name.lower()}@example.com')
+            user.groups.add(group)
+            cls.role_users[name] = user
+        cls.category = Category.objects.create(name='Tech', description='Tech stuff')
+        cls.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date=timezone.localdate(), time='10:00:00',
+            location='Online', category=cls.category
+        )
+
+    def grow(self, size):
+        """Bring every table a view might list up to ``size`` rows."""
+        User = get_user_model()
+        have = Event.objects.count()
+        for i in range(have, size):
+            category = Category.objects.create(name=f'Category {i}', description='More')
+            event = Event.objects.create(
+                name=f'Event {i}', description='Desc', date=timezone.localdate(), time='11:00:00',
+                location='Online', category=category if i % 2 else self.category
+            )
+            user = User.objects.create_user(username=f'member{i}', email=f'member{i}@example.com')
+            user.groups.add(self.groups['Participant'])
+        users = list(User.objects.all())
+        for event in Event.objects.all():
+            event.participants.add(*users)
+
+    def url_for(self, name):
+        args = {
+            'activate': ['MQ', 'set-password'],
+            'password_reset_confirm': ['MQ', 'set-password'],
+            'user_calendar': [self.role_users['Participant'].calendar_token],
+        }.get(name)
+        if args is None and name.startswith(('event_', 'rsvp_')) and name not in ('event_list', 'event_create', 'event_export'):
+            args = [self.event.pk]
+        if args is None and name.startswith('category_') and name not in ('category_list', 'category_create'):
+            args = [self.category.pk]
+        return reverse(name, args=args)
+
+    def test_every_url_has_a_budget(self):
+        from .urls import urlpatterns
+        self.assertEqual({pattern.name for pattern in urlpatterns}, set(QUERY_BUDGETS))
+
+    def test_query_counts_are_bounded_and_constant(self):
+        runs = {}
+        for size in DATASET_SIZES:
+            self.grow(size)
+            for name in QUERY_BUDGETS:
+                for index, role in enumerate(QUERY_ROLES):
+                    client = Client()
+                    if role:
+                        client.force_login(self.role_users[role])
+                    cache.clear()
+                    caches['pages'].clear()
+                    with record_queries() as recorder:
+                        response = client.get(self.url_for(name))
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                    runs.setdefault((name, index), []).append((size, recorder.queries))
+
+        for (name, index), measured in runs.items():
+            with self.subTest(url=name, role=QUERY_ROLES[index]):
+                self.assertConstantQueries(
+                    measured, QUERY_BUDGETS[name][index], msg=f'{name} as {QUERY_ROLES[index] or "anonymous"}: '
+                )
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_replicas_only_when_enabled(self):
+        self.assertEqual(self.router.db_for_read(Event), 'default')
+        with mock.patch('events.routers.connections') as connections:
+            connections.__getitem__.return_value.in_atomic_block = False
+            with use_replicas():
+                self.assertEqual(self.router.db_for_read(Event), 'replica_1')
+            connections.__getitem__.return_value.in_atomic_block = True
+            with use_replicas():
+                self.assertEqual(self.router.db_for_read(Event), 'default')
+        self.assertEqual(self.router.db_for_write(Event), 'default')
+        self.assertFalse(self.router.allow_migrate('replica_1', 'events'))
+
+    def test_writes_pin_the_client_to_the_primary(self):
+
+        seen = []
+
+        def get_response(request):
+            before = bool(_use_replicas.get())
+            request.resolver_match = resolve(request.path)
+            middleware.process_view(request, request.resolver_match.func, (), {})
+            seen.append((before, bool(_use_replicas.get())))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        factory = RequestFactory()
+
+        middleware(factory.get('/events/'))
+        response = middleware(factory.post('/events/1/rsvp/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        pinned = factory.get('/events/')
+        pinned.COOKIES[PIN_COOKIE] = '1'
+        middleware(pinned)
+        self.assertEqual(seen, [(False, True), (False, False), (False, False)])
+
+    def test_only_event_read_views_use_replicas(self):
+        seen = {}
+
+        def view(request):
+            seen[request.resolver_match.url_name] = bool(_use_replicas.get())
+            return HttpResponse()
+
+        def get_response(request):
+            request.resolver_match = resolve(request.path)
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        for path in ['/', '/events/1/', '/categories/', '/profile/', '/profile/edit/', '/login/']:
+            middleware(RequestFactory().get(path))
+        self.assertEqual(seen, {
+            'dashboard': True, 'event_detail': True, 'category_list': True,
+            'profile': False, 'profile_edit': False, 'login': False,
+        })
+
+
+def async_urlconf():
+    """``events.urls`` with the async versions of the hot read views swapped in."""
+    from types import ModuleType
+    from django.urls import path
+    from . import async_views, urls
+    swapped = {
+        'dashboard': async_views.AsyncDashboardView,
+        'event_list': async_views.AsyncEventListView,
+        'event_detail': async_views.AsyncEventDetailView,
+    }
+    urlconf = ModuleType('async_urls')
+    urlconf.urlpatterns = [
+        path(str(pattern.pattern), swapped[pattern.name].as_view(), name=pattern.name)
+        if pattern.name in swapped else pattern
+        for pattern in urls.urlpatterns
+    ]
+    return urlconf
+
+
+@override_settings(ROOT_URLCONF=async_urlconf())
+class AsyncViewTests(QueryCountAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='guest', email='guest@example.com')
+        cls.user.groups.add(Group.objects.create(name='Participant'))
+        cls.category = Category.objects.create(name='Tech', description='Tech stuff')
+        cls.event = Event.objects.create(
+            name='Tech Talk', description='Desc', date=timezone.localdate(), time='10:00:00',
+            location='Online', category=cls.category
+        )
+        cls.event.participants.add(cls.user)
+
+    def setUp(self):
+        cache.clear()
+        caches['pages'].clear()
+
+    async def test_anonymous_pages_are_cached(self):
+        list_url = reverse('event_list')
+        detail_url = reverse('event_detail', args=[self.event.pk])
+        self.assertContains(await self.async_client.get(list_url), 'Tech Talk')
+        response = await self.async_client.get(detail_url)
+        self.assertContains(response, 'guest@example.com')
+
+        with record_queries() as recorder:
+            self.assertContains(await self.async_client.get(list_url), 'Tech Talk')
+            cached = await self.async_client.get(detail_url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(len(recorder), 0)
+
+        self.assertEqual((await self.async_client.get(reverse('event_detail', args=[999]))).status_code, 404)
+
+    async def test_list_fragments_evicted_before_render(self):
+        # The fragments were there when checked but are gone by the time the template renders.
+        with mock.patch('events.async_views.ahas_fragment', return_value=True):
+            response = await self.async_client.get(reverse('event_list'))
+        self.assertContains(response, 'Tech Talk')
+        self.assertContains(response, f'<option value="{self.category.pk}"')
+        self.assertRedirects(await self.async_client.get(reverse('dashboard')), '/login/?next=/', fetch_redirect_response=False)
+
+    async def test_participant_pages_within_budget(self):
+        await self.async_client.aforce_login(self.user)
+        for name, args, text in (
+            ('dashboard', [], 'Tech Talk'),
+            ('event_list', [], 'Tech Talk'),
+            ('event_detail', [self.event.pk], "RSVP'd"),
+        ):
+            with self.subTest(url=name):
+                with record_queries() as recorder:
+                    response = await self.async_client.get(reverse(name, args=args))
+                self.assertContains(response, text)
+                self.assertLessEqual(len(recorder), QUERY_BUDGETS[name][1])
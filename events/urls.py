@@ -1,10 +1,22 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
 
+# The hot read views have native async versions for ASGI deployments.
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    DashboardView = async_views.AsyncDashboardView
+    EventListView = async_views.AsyncEventListView
+    EventDetailView = async_views.AsyncEventDetailView
+else:
+    DashboardView = views.DashboardView
+    EventListView = views.EventListView
+    EventDetailView = views.EventDetailView
+
 urlpatterns = [
     # Dashboard
-    path('', views.DashboardView.as_view(), name='dashboard'),
+    path('', DashboardView.as_view(), name='dashboard'),
     
     # Authentication
     path('signup/', views.UserSignupView.as_view(), name='sign_up'),
@@ -15,6 +27,8 @@ urlpatterns = [
     # Profile
     path('profile/', views.ProfileDetailView.as_view(), name='profile'),
     path('profile/edit/', views.ProfileUpdateView.as_view(), name='profile_edit'),
+    path('profile/calendar/<str:token>.ics', views.UserCalendarView.as_view(), name='user_calendar'),
+    path('profile/calendar/reset/', views.CalendarTokenResetView.as_view(), name='calendar_token_reset'),
     path('profile/change-password/', views.CustomPasswordChangeView.as_view(), name='change_password'),
     path('password-reset/', auth_views.PasswordResetView.as_view(template_name='registration/password_reset_form.html'), name='password_reset'),
     path('password-reset/done/', auth_views.PasswordResetDoneView.as_view(template_name='registration/password_reset_done.html'), name='password_reset_done'),
@@ -22,16 +36,21 @@ urlpatterns = [
     path('password-reset-complete/', auth_views.PasswordResetCompleteView.as_view(template_name='registration/password_reset_complete.html'), name='password_reset_complete'),
 
     # Events
-    path('events/', views.EventListView.as_view(), name='event_list'),
-    path('events/<int:pk>/', views.EventDetailView.as_view(), name='event_detail'),
+    path('events/', EventListView.as_view(), name='event_list'),
+    path('events/<int:pk>/', EventDetailView.as_view(), name='event_detail'),
     path('events/new/', views.EventCreateView.as_view(), name='event_create'),
     path('events/<int:pk>/edit/', views.EventUpdateView.as_view(), name='event_update'),
     path('events/<int:pk>/delete/', views.EventDeleteView.as_view(), name='event_delete'),
     path('events/<int:pk>/rsvp/', views.RSVPEventView.as_view(), name='rsvp_event'),
+    path('events/<int:pk>/participants/', views.EventParticipantsView.as_view(), name='event_participants'),
+    path('events/<int:pk>/participants/add/', views.BulkRSVPView.as_view(), name='event_bulk_rsvp'),
+    path('events/<int:pk>/participants/export/', views.EventParticipantsExportView.as_view(), name='event_participants_export'),
+    path('events/export/', views.EventExportView.as_view(), name='event_export'),
     
     # Categories
     path('categories/', views.CategoryListView.as_view(), name='category_list'),
     path('categories/new/', views.CategoryCreateView.as_view(), name='category_create'),
     path('categories/<int:pk>/edit/', views.CategoryUpdateView.as_view(), name='category_update'),
     path('categories/<int:pk>/delete/', views.CategoryDeleteView.as_view(), name='category_delete'),
+    path('categories/<int:pk>/calendar.ics', views.CategoryCalendarView.as_view(), name='category_calendar'),
 ]
@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
 from django.contrib.auth import login, logout, get_user_model
 from django.contrib.auth.models import Group
 User = get_user_model()
@@ -7,13 +8,25 @@ from django.utils.decorators import method_decorator, classonlymethod
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.views import PasswordChangeView, PasswordResetView, PasswordResetConfirmView
 from django.contrib import messages
+from django.conf import settings
 from django.db.models import Count, Q
 from django.urls import reverse_lazy, reverse
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, View, RedirectView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, View, RedirectView, FormView
 from django.utils import timezone
-from .models import Category, Event
-from .forms import CategoryForm, EventForm, UserSignupForm, UserUpdateForm
+from django.utils.cache import get_conditional_response
+from .models import ArchivedEvent, Category, Event
+from .forms import BulkRSVPForm, CategoryForm, EventForm, UserSignupForm, UserUpdateForm
 from .decorators import unauthenticated_user, allowed_users, admin_only
+from .roles import get_user_roles, has_role
+from .counters import get_counts
+from . import exports, feeds, rsvp
+from .rsvp import bulk_rsvp, resolve_user_ids
+from .pagination import EVENT_ORDERING, KeysetPaginator, get_page_size
+from .search import search_events
+from .pagecache import (
+    LIST_SCOPE, AnonymousPageCacheMixin, category_scope, event_scope, get_versions, make_key,
+    normalize_params, user_scope,
+)
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
@@ -67,10 +80,10 @@ class ActivateAccountView(RedirectView):
 # Dashboard
 class DashboardView(LoginRequiredMixin, TemplateView):
     def get_template_names(self):
-        user = self.request.user
-        if user.groups.filter(name='Admin').exists():
+        roles = get_user_roles(self.request.user)
+        if 'Admin' in roles:
             return ['events/dashboard_admin.html']
-        elif user.groups.filter(name='Organizer').exists():
+        elif 'Organizer' in roles:
             return ['events/dashboard_organizer.html']
         else:
             return ['events/dashboard_participant.html']
@@ -78,42 +91,84 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
+        roles = get_user_roles(user)
         today = timezone.now().date()
         
-        if user.groups.filter(name='Admin').exists():
-            context['total_users'] = User.objects.count()
-            context['total_events'] = Event.objects.count()
-            context['total_categories'] = Category.objects.count()
-            context['events'] = Event.objects.all().order_by('date') # Show all events for admin
-        elif user.groups.filter(name='Organizer').exists():
-            # Assuming organizers can see all events or just theirs? 
-            # Existing code: Event.objects.all().order_by('date')
-            context['total_events'] = Event.objects.count()
-            context['total_categories'] = Category.objects.count()
-            context['events'] = Event.objects.all().order_by('date')
+        if 'Admin' in roles:
+            totals = get_counts('users', 'events', 'categories')
+            context['total_users'] = totals['users']
+            context['total_events'] = totals['events']
+            context['total_categories'] = totals['categories']
+            context['events'] = self.get_upcoming_events(today)
+        elif 'Organizer' in roles:
+            totals = get_counts('events', 'categories')
+            context['total_events'] = totals['events']
+            context['total_categories'] = totals['categories']
+            context['events'] = self.get_upcoming_events(today)
         else: # Participant
             context['rsvp_events'] = user.rsvp_events.all()
         return context
 
+    def get_upcoming_events(self, today):
+        limit = getattr(settings, 'DASHBOARD_EVENT_LIMIT', 20)
+        return (Event.objects.filter(date__gte=today)
+                .order_by('date', 'time', 'id')
+                .only('name', 'date', 'time')[:limit])
+
 # RSVP
 class RSVPEventView(LoginRequiredMixin, UserPassesTestMixin, View):
+    # (message level, message, JSON status code) per rsvp() result
+    RESULTS = {
+        rsvp.REGISTERED: (messages.SUCCESS, "You have successfully RSVP'd to {event}!", 201),
+        rsvp.ALREADY_REGISTERED: (messages.WARNING, "You have already RSVP'd to this event.", 200),
+        rsvp.FULL: (messages.ERROR, "Sorry, {event} is full.", 409),
+        rsvp.NOT_FOUND: (messages.ERROR, "{event} is no longer available.", 404),
+    }
+
     def test_func(self):
-        return self.request.user.groups.filter(name='Participant').exists()
+        return has_role(self.request.user, 'Participant')
 
     def handle_no_permission(self):
          messages.warning(self.request, "Only participants can RSVP.")
          return redirect('event_detail', pk=self.kwargs['pk'])
 
     def get(self, request, *args, **kwargs):
+        # RSVPs change state, so they are POST only; old links just land on the event.
+        return redirect('event_detail', pk=kwargs.get('pk'))
+
+    def post(self, request, *args, **kwargs):
         pk = kwargs.get('pk')
         event = get_object_or_404(Event, pk=pk)
-        if request.user in event.participants.all():
-            messages.warning(request, "You have already RSVP'd to this event.")
-        else:
-            event.participants.add(request.user)
-            messages.success(request, f"You have successfully RSVP'd to {event.name}!")
+        result = rsvp.rsvp(event, request.user)
+        level, message, status = self.RESULTS[result]
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse({'result': result}, status=status)
+        if result == rsvp.NOT_FOUND:
+            raise Http404(message.format(event=event.name))
+        messages.add_message(request, level, message.format(event=event.name))
         return redirect('event_detail', pk=pk)
 
+@method_decorator(login_required, name='dispatch')
+@method_decorator(allowed_users(['Admin', 'Organizer']), name='dispatch')
+class BulkRSVPView(FormView):
+    form_class = BulkRSVPForm
+    template_name = 'events/bulk_rsvp_form.html'
+
+    def dispatch(self, request, *args, **kwargs):
+        self.event = get_object_or_404(Event, pk=kwargs['pk'])
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['event'] = self.event
+        return context
+
+    def form_valid(self, form):
+        user_ids = resolve_user_ids(form.cleaned_data['users'], form.cleaned_data['groups'])
+        added = bulk_rsvp(self.event, user_ids)
+        messages.success(self.request, f"Registered {added} new participant(s) for {self.event.name}.")
+        return redirect('event_detail', pk=self.event.pk)
+
 # Profile Views
 class ProfileDetailView(LoginRequiredMixin, DetailView):
     model = User
@@ -123,6 +178,14 @@ class ProfileDetailView(LoginRequiredMixin, DetailView):
     def get_object(self):
         return self.request.user
 
+class CalendarTokenResetView(LoginRequiredMixin, View):
+    """Replace the user's calendar feed link, revoking the old one."""
+
+    def post(self, request, *args, **kwargs):
+        feeds.reset_user_token(request.user)
+        messages.success(request, 'Your calendar link has been replaced. Update it in your calendar app.')
+        return redirect('profile')
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = UserUpdateForm
@@ -145,19 +208,15 @@ class CustomPasswordChangeView(LoginRequiredMixin, PasswordChangeView):
         return super().form_valid(form)
 
 # Event Views
-class EventListView(ListView):
-    model = Event
-    template_name = 'events/event_list.html'
-    context_object_name = 'events'
+class EventFilterMixin:
+    """The event list's filters and ordering, shared with the CSV/NDJSON export."""
 
     def get_queryset(self):
-        queryset = Event.objects.select_related('category').prefetch_related('participants')
+        queryset = Event.objects.select_related('category')
         
         search_query = self.request.GET.get('search', '')
         if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) | Q(location__icontains=search_query)
-            )
+            queryset = search_events(queryset, search_query)
         
         category_id = self.request.GET.get('category')
         if category_id:
@@ -168,25 +227,155 @@ class EventListView(ListView):
         if start_date and end_date:
             queryset = queryset.filter(date__range=[start_date, end_date])
 
-        return queryset.annotate(participant_count=Count('participants'))
+        return queryset
+
+    def get_ordering(self):
+        # Search results are ranked by relevance, everything else is chronological
+        # unless the most popular events were asked for.
+        if self.request.GET.get('sort') == 'popular':
+            return ('-participant_count', 'id')
+        if self.request.GET.get('search'):
+            return ('-search_rank', 'id')
+        return EVENT_ORDERING
+
+class EventListView(AnonymousPageCacheMixin, EventFilterMixin, ListView):
+    model = Event
+    template_name = 'events/event_list.html'
+    context_object_name = 'events'
+
+    def get_paginate_by(self, queryset):
+        return get_page_size(self.request.GET.get('page_size'))
+
+    def get_page(self, queryset, page_size):
+        return KeysetPaginator(queryset, page_size, self.get_ordering()).page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        # All lazy: the page is only fetched if the template renders the table,
+        # not when it comes out of the fragment cache. Templates call is_paginated.
+        page = self.get_page(queryset, page_size)
+        return (None, page, page, page.has_other_pages)
+
+    def page_cache_params(self):
+        return normalize_params(self.request.GET, [
+            'search', 'category', 'start_date', 'end_date', 'sort', 'page_size', 'after', 'before',
+        ])
 
     def get_context_data(self, **kwargs):
+        version = get_versions(LIST_SCOPE)[LIST_SCOPE]
         context = super().get_context_data(**kwargs)
         context['categories'] = Category.objects.all()
+        context['table_cache_key'] = make_key(version, self.page_cache_params())
+        context['filters_cache_key'] = make_key(version, self.request.GET.get('category'))
         return context
 
-class EventDetailView(DetailView):
+def participants_page_size(value=None):
+    return get_page_size(
+        value,
+        default=getattr(settings, 'PARTICIPANTS_PAGE_SIZE', 50),
+        maximum=getattr(settings, 'PARTICIPANTS_MAX_PAGE_SIZE', 200),
+    )
+
+def participants_paginator(event, page_size=None):
+    # Ordered by user id, so each page is a range scan on the participants table.
+    queryset = event.participants.only('username', 'email')
+    return KeysetPaginator(queryset, page_size or participants_page_size(), ('id',))
+
+class EventDetailView(AnonymousPageCacheMixin, DetailView):
     model = Event
     template_name = 'events/event_detail.html'
     context_object_name = 'event'
-    queryset = Event.objects.select_related('category').prefetch_related('participants')
+    queryset = Event.objects.select_related('category')
+
+    def page_cache_scopes(self):
+        return [event_scope(self.kwargs['pk'])]
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            # Past events move to the archive (see events/archive.py) and stay readable.
+            return get_object_or_404(ArchivedEvent.objects.select_related('category'), pk=self.kwargs['pk'])
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
             context['is_rsvped'] = self.object.participants.filter(id=self.request.user.id).exists()
+        scope = event_scope(self.object.pk)
+        context['participants_cache_key'] = make_key(get_versions(scope)[scope])
+        # Only the first page; later pages come from EventParticipantsView on demand.
+        # The page is fetched lazily, so a cached participants fragment skips the query.
+        context['participants_page'] = participants_paginator(self.object).page()
         return context
 
+class EventParticipantsView(AnonymousPageCacheMixin, ListView):
+    """One page of an event's participants, as an HTML partial or, with ?format=json, JSON."""
+    template_name = 'events/includes/participant_rows.html'
+
+    def page_cache_scopes(self):
+        return [event_scope(self.kwargs['pk'])]
+
+    def page_cache_params(self):
+        return normalize_params(self.request.GET, ['after', 'page_size', 'format'])
+
+    def get_queryset(self):
+        self.event = (Event.objects.only('id').filter(pk=self.kwargs['pk']).first()
+                      or get_object_or_404(ArchivedEvent.objects.only('id'), pk=self.kwargs['pk']))
+        return self.event.participants.only('username', 'email')
+
+    def get_paginate_by(self, queryset):
+        return participants_page_size(self.request.GET.get('page_size'))
+
+    def paginate_queryset(self, queryset, page_size):
+        page = KeysetPaginator(queryset, page_size, ('id',)).page(after=self.request.GET.get('after'))
+        return (None, page, page.object_list, page.has_next())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['event'] = self.event
+        context['page'] = context['page_obj']
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') == 'json':
+            page = context['page_obj']
+            return JsonResponse({
+                'participants': [{'username': p.username, 'email': p.email} for p in page],
+                'next': page.next_cursor,
+            })
+        return super().render_to_response(context, **response_kwargs)
+
+def export_format(request):
+    fmt = request.GET.get('format', 'csv')
+    return fmt if fmt in exports.FORMATS else None
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(allowed_users(['Admin', 'Organizer']), name='dispatch')
+class EventExportView(EventFilterMixin, View):
+    """Every event matching the list's filters, streamed as CSV or, with ?format=ndjson, NDJSON."""
+
+    def get(self, request, *args, **kwargs):
+        fmt = export_format(request)
+        if fmt is None:
+            return HttpResponseBadRequest('Unknown export format.')
+        queryset = self.get_queryset().order_by(*self.get_ordering())
+        return exports.stream(queryset, exports.EVENT_COLUMNS, fmt, 'events')
+
+@method_decorator(login_required, name='dispatch')
+@method_decorator(allowed_users(['Admin', 'Organizer']), name='dispatch')
+class EventParticipantsExportView(View):
+    """An event's full roster, streamed as CSV or NDJSON."""
+
+    def get(self, request, *args, **kwargs):
+        fmt = export_format(request)
+        if fmt is None:
+            return HttpResponseBadRequest('Unknown export format.')
+        event = get_object_or_404(Event.objects.only('id'), pk=kwargs['pk'])
+        queryset = event.participants.order_by('id')
+        return exports.stream(queryset, exports.PARTICIPANT_COLUMNS, fmt, f'event-{event.pk}-participants')
+
 @method_decorator(login_required, name='dispatch')
 @method_decorator(allowed_users(['Admin', 'Organizer']), name='dispatch')
 class EventCreateView(CreateView):
@@ -210,6 +399,52 @@ class EventDeleteView(DeleteView):
     template_name = 'events/event_confirm_delete.html'
     success_url = reverse_lazy('event_list')
 
+# Calendar feeds (see events/feeds.py)
+class CalendarFeedMixin:
+    """
+    Answer with a 304, without querying events, while the feed's version scope is
+    unchanged. Views provide ``get_feed_scope()``, ``get_feed_title()`` and
+    ``get_feed_queryset()``.
+    """
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = feeds.validators(request, self.get_feed_scope())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            title = self.get_feed_title()
+            response = feeds.stream(request, self.get_feed_queryset(), title, last_modified)
+        return feeds.set_validators(response, etag, last_modified)
+
+class UserCalendarView(CalendarFeedMixin, View):
+    """A user's RSVPs. Calendar apps can't log in, so the secret token in the URL identifies the user."""
+
+    def dispatch(self, request, *args, **kwargs):
+        self.user_id = feeds.user_from_token(kwargs['token'])
+        if self.user_id is None:
+            raise Http404('No calendar found matching the token')
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_feed_scope(self):
+        return user_scope(self.user_id)
+
+    def get_feed_title(self):
+        return 'My RSVPs'
+
+    def get_feed_queryset(self):
+        return Event.objects.filter(participants=self.user_id)
+
+class CategoryCalendarView(CalendarFeedMixin, View):
+    """A category's events, public like the event list."""
+
+    def get_feed_scope(self):
+        return category_scope(self.kwargs['pk'])
+
+    def get_feed_title(self):
+        return get_object_or_404(Category.objects.only('name'), pk=self.kwargs['pk']).name
+
+    def get_feed_queryset(self):
+        return Event.objects.filter(category=self.kwargs['pk'])
+
 # Category CRUD - Admin & Organizer only
 @method_decorator(login_required, name='dispatch')
 @method_decorator(allowed_users(['Admin', 'Organizer']), name='dispatch')
@@ -0,0 +1,103 @@
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import URLPattern, URLResolver, get_resolver
+
+# Recorded per view: query count, DB time, template render time, total time (ms),
+# and DB connections opened (0 when persistent or pooled connections are reused)
+METRICS = ('queries', 'db', 'render', 'total', 'connects')
+
+# Log-scale histogram: bucket i holds values up to BUCKET_RATIO ** i, so percentiles
+# are read back as bucket upper bounds, within 25% of the real value.
+BUCKET_RATIO = 1.25
+MAX_BUCKET = 64
+
+STATS_CACHE_KEY = 'events:viewstats:{}:{}:{}'
+
+
+def bucket_for(value):
+    if value <= 1:
+        return 0
+    return min(math.ceil(math.log(value, BUCKET_RATIO)), MAX_BUCKET)
+
+
+def bucket_upper(index):
+    return BUCKET_RATIO ** index
+
+
+def get_cache():
+    # Shared by the workers and `manage.py view_stats` (Redis, or files on one host).
+    return caches[getattr(settings, 'VIEW_STATS_CACHE', 'default')]
+
+
+def _key(name, metric, bucket):
+    return STATS_CACHE_KEY.format(name, metric, bucket)
+
+
+def record(name, values):
+    """Add one sample of ``{metric: value}`` for view ``name`` to the shared histograms."""
+    timeout = getattr(settings, 'VIEW_TIMING_RETENTION', 86400)
+    cache = get_cache()
+    for metric in METRICS:
+        key = _key(name, metric, bucket_for(values[metric]))
+        # add() is a no-op if the bucket exists. incr() is atomic on Redis; on the file
+        # cache concurrent workers can occasionally drop a sample, which is fine here.
+        cache.add(key, 0, timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def view_names(patterns=None, namespace=''):
+    """Every named route in the URLconf, as ``namespace:name``."""
+    names = []
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            names.extend(view_names(pattern.url_patterns, prefix))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.append(f'{namespace}{pattern.name}')
+    return names
+
+
+def percentile(histogram, total, fraction):
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= fraction * total:
+            return bucket_upper(bucket)
+    return None
+
+
+def summary(names=None):
+    """``{name: {'samples': n, metric: (p50, p95, p99)}}`` for every view with samples."""
+    names = names or view_names() + ['<unresolved>']
+    keys = [_key(name, metric, bucket) for name in names for metric in METRICS for bucket in range(MAX_BUCKET + 1)]
+    counts = get_cache().get_many(keys)
+
+    stats = {}
+    for name in names:
+        row = {}
+        for metric in METRICS:
+            histogram = {
+                bucket: counts[_key(name, metric, bucket)]
+                for bucket in range(MAX_BUCKET + 1) if counts.get(_key(name, metric, bucket))
+            }
+            total = sum(histogram.values())
+            if not total:
+                break
+            row['samples'] = total
+            row[metric] = tuple(percentile(histogram, total, p) for p in (0.5, 0.95, 0.99))
+        else:
+            stats[name] = row
+    return stats
+
+
+def reset(names=None):
+    names = names or view_names() + ['<unresolved>']
+    get_cache().delete_many([
+        _key(name, metric, bucket)
+        for name in names for metric in METRICS for bucket in range(MAX_BUCKET + 1)
+    ])
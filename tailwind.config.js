@@ -1,10 +1,11 @@
 /** @type {import('tailwindcss').Config} */
 module.exports = {
+    // Only classes found here end up in static/css/app.css.
     content: [
         './templates/**/*.html',
         './events/templates/**/*.html',
-        './**/templates/**/*.html',
-        './**/*.py',
+        // Widget classes set in forms
+        './events/**/*.py',
     ],
     theme: {
         extend: {},